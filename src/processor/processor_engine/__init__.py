@@ -1,26 +1,39 @@
 """Processor Engine Package for Timetable Extraction."""
 
+import importlib
+
 __version__ = "0.1.0"
 
-from .main import process_timetable, save_to_json
-from .models import TimetableDocument, TimetableEntry, Weekday, TimeSlot
-from .preprocessor import DocumentPreprocessor
-from .ocr_extractor import OCRExtractor
-from .table_detector import TableDetector
-from .parser import TimetableParser
-from .utils import validate_document, is_supported_file
-
-__all__ = [
-    'process_timetable',
-    'save_to_json',
-    'TimetableDocument',
-    'TimetableEntry',
-    'Weekday',
-    'TimeSlot',
-    'DocumentPreprocessor',
-    'OCRExtractor',
-    'TableDetector',
-    'TimetableParser',
-    'validate_document',
-    'is_supported_file',
-]
+# Public names and the submodule defining each. They are imported on first
+# access, so light entry points (the CLI's usage message) don't load the
+# OCR and table detection stack.
+_EXPORTS = {
+    'process_timetable': '.main',
+    'save_to_json': '.main',
+    'TimetableDocument': '.models',
+    'TimetableEntry': '.models',
+    'Weekday': '.models',
+    'TimeSlot': '.models',
+    'OCRBatch': '.models',
+    'DocumentPreprocessor': '.preprocessor',
+    'OCRExtractor': '.ocr_extractor',
+    'TableDetector': '.table_detector',
+    'TimetableParser': '.parser',
+    'validate_document': '.utils',
+    'is_supported_file': '.utils',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
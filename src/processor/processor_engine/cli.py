@@ -0,0 +1,214 @@
+"""Command-line interface shared by scripts/run.py and ``python -m processor_engine``."""
+
+import argparse
+import functools
+import sys
+from pathlib import Path
+
+# Section separator for the console report
+_BAR = "=" * 70
+
+# The OCR stack and SQLAlchemy are imported inside main() and _engine(), so
+# the usage/--help path doesn't pay for loading them
+
+
+def _build_arg_parser(prog: str) -> argparse.ArgumentParser:
+    """Command-line options for the processor CLI."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "Supported formats: PDF, DOCX, PNG, JPG, JPEG, BMP, TIFF\n"
+            "\n"
+            "Examples:\n"
+            "  python scripts/run.py timetable.pdf\n"
+            "  python scripts/run.py schedule.png --output results.json\n"
+            "  python scripts/run.py timetable.pdf --gpu"
+        ),
+    )
+    parser.add_argument("file_path", help="Path to timetable file")
+    parser.add_argument("--gpu", action="store_true", help="Use GPU acceleration for OCR")
+    parser.add_argument("--output", help="Specify output JSON file path")
+    parser.add_argument(
+        "--cache-dir",
+        help="Reuse preprocessed pages from this directory across runs on the same file "
+             "(e.g. ~/.cache/tt_processor)",
+    )
+    return parser
+
+
+@functools.lru_cache(maxsize=1)
+def _engine():
+    """
+    Database engine shared by every main() call in this process.
+    
+    The schema is created on first use only, so a long-lived worker that
+    calls main() repeatedly skips the CREATE TABLE IF NOT EXISTS checks.
+    """
+    from .database import get_db_engine, create_tables
+    
+    # Use repo-level db directory (../../db/timetable.sqlite relative to src/processor)
+    engine = get_db_engine(db_path="../../db/timetable.sqlite")
+    create_tables(engine)
+    return engine
+
+
+def _row(entry, source_id: int) -> dict:
+    """
+    ExtractedActivities column values for one timetable entry.
+    
+    Args:
+        entry: TimetableEntry to store
+        source_id: Id of the TimetableSource row the entry belongs to
+    
+    Returns:
+        Column-name -> value mapping for bulk_insert_activities()
+    """
+    ts = entry.timeslot
+    return {
+        "source_id": source_id,
+        "activity_name": entry.activity or None,
+        "day": entry.weekday.value if entry.weekday else "Unknown",
+        # Times are stored as isoformat strings, or "" when unknown
+        "start_time": ts.start_time.isoformat() if ts and ts.start_time else "",
+        "end_time": ts.end_time.isoformat() if ts and ts.end_time else "",
+        "notes": entry.notes or None,
+    }
+
+
+def _persist_to_db(document, before_commit=None) -> int:
+    """
+    Store a processed document and its activities in the SQLite database.
+    
+    Args:
+        document: TimetableDocument returned by process_timetable()
+        before_commit: Optional callable run after the inserts, inside the
+            transaction; if it raises, nothing is committed
+    
+    Returns:
+        Id of the new TimetableSource row
+    """
+    from .database import bulk_insert_activities, TimetableSource
+    from sqlalchemy.orm import Session
+    
+    # One transaction for the source row and its activities, so the
+    # run costs a single commit (and WAL sync); flush() assigns ts.id
+    with Session(_engine()) as session, session.begin():
+        ts = TimetableSource(file_path=str(document.file_path))
+        session.add(ts)
+        session.flush()
+        
+        source_id = ts.id
+        
+        # Insert extracted activities with one executemany instead of
+        # one ORM object and INSERT per entry
+        if document.entries:
+            rows = [_row(entry, source_id) for entry in document.entries]
+            bulk_insert_activities(session, rows)
+        
+        if before_commit is not None:
+            before_commit()
+    
+    return source_id
+
+
+def main(prog: str = "python scripts/run.py"):
+    """
+    Main entry point for command-line execution.
+    
+    Processes the file named on the command line, writes the extracted
+    timetable to JSON and stores it in the SQLite database, then prints
+    ``{"timetable_source_id": ...}`` as the last line of output.
+    
+    Args:
+        prog: Program name shown in the usage message
+    """
+    
+    arg_parser = _build_arg_parser(prog)
+    if len(sys.argv) < 2:
+        print(f"{_BAR}\nTIMETABLE PROCESSOR - Command Line Interface\n{_BAR}")
+        arg_parser.print_help()
+        sys.exit(1)
+    
+    # Parse argv once. Unknown options are ignored as before, but a known
+    # option missing its value (a trailing --output) now makes argparse
+    # exit with status 2 instead of falling back to the default path
+    args, _ = arg_parser.parse_known_args()
+    
+    from .main import process_timetable, save_to_json
+    from .utils import format_confidence_report, is_supported_file, validate_document
+    from concurrent.futures import ThreadPoolExecutor
+    import json
+    
+    file_path = Path(args.file_path)
+    use_gpu = args.gpu
+    
+    # Determine output path
+    output_path = args.output or file_path.stem + "_extracted.json"
+    
+    # Validate file
+    if not is_supported_file(file_path):
+        print(f"\n✗ Error: Unsupported file format")
+        print("  Supported formats: PDF, DOCX, PNG, JPG, JPEG, BMP, TIFF")
+        sys.exit(1)
+    
+    try:
+        # Process the timetable
+        document = process_timetable(file_path, use_gpu=use_gpu, cache_dir=args.cache_dir)
+        
+        # The JSON file is written in the background while the report is
+        # built and the rows are inserted. The database transaction waits
+        # for the write and rolls back if it failed, so a run never leaves
+        # rows behind without its output file.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            json_future = executor.submit(save_to_json, document, output_path, verbose=False)
+            
+            # Validate results
+            warnings = validate_document(document)
+            if warnings:
+                lines = "\n".join(f"⚠ {warning}" for warning in warnings)
+                print(f"\n{_BAR}\nVALIDATION WARNINGS\n{_BAR}\n{lines}")
+            
+            # Display confidence report
+            print(f"\n{_BAR}\nCONFIDENCE ANALYSIS\n{_BAR}\n{format_confidence_report(document)}")
+            
+            # Persist results to SQLite database and return the timetable source id
+            print(f"\n{_BAR}\nSAVING RESULTS\n{_BAR}")
+            try:
+                source_id = _persist_to_db(document, before_commit=json_future.result)
+                db_error = None
+            except Exception as e:
+                db_error = e
+            
+            # A failed JSON write is re-raised here and reported like any
+            # other processing error
+            json_future.result()
+            print(f"✓ Saved to: {output_path}")
+            
+            if db_error is not None:
+                print(f"\n✗ Database Error: {db_error}")
+                import traceback
+                traceback.print_exception(db_error)
+                sys.exit(1)
+            
+            # Store source_id to print at the very end
+            result_json = json.dumps({"timetable_source_id": source_id})
+        
+        print("\n✓ Processing completed successfully!")
+        print(f"\nNext step: Use the extracted data from '{output_path}' for database integration")
+        
+        # Print result JSON as the absolute last line so callers (Node) can parse the source id
+        print(result_json)
+        
+    except FileNotFoundError as e:
+        print(f"\n✗ File Error: {e}")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"\n✗ Validation Error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Processing Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
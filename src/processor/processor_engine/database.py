@@ -1,9 +1,9 @@
 """Database setup and models for processor engine."""
 
 from pathlib import Path
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Engine, create_engine, event
 from sqlalchemy.orm import DeclarativeBase
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 class Base(DeclarativeBase):
@@ -17,7 +17,8 @@ class TimetableSource(Base):
 
     id = Column(Integer, primary_key=True)
     file_path = Column(String(500), nullable=False, unique=True)
-    processed_at = Column(DateTime, nullable=True)
+    # Set to the current UTC time on INSERT unless given explicitly
+    processed_at = Column(DateTime, nullable=True, default=lambda: datetime.now(timezone.utc))
 
 
 class ExtractedActivities(Base):
@@ -48,7 +49,30 @@ def get_db_engine(db_path: str = "timetable_data.db"):
     full_db_path = project_root / db_path
     connection_string = f"sqlite:///{full_db_path}"
 
-    return create_engine(connection_string, echo=False)
+    engine = create_engine(
+        connection_string,
+        echo=False,
+        connect_args={"check_same_thread": False},
+    )
+    event.listen(engine, "connect", _configure_sqlite_connection)
+    return engine
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record) -> None:
+    """
+    Apply write-friendly SQLite settings to every new connection.
+
+    WAL journaling with synchronous=NORMAL avoids an fsync per transaction
+    while staying crash-safe; temp tables and a 64 MB page cache live in memory.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-65536")
+    finally:
+        cursor.close()
 
 
 def create_tables(engine) -> None:
@@ -59,3 +83,23 @@ def create_tables(engine) -> None:
         engine: SQLAlchemy Engine instance
     """
     Base.metadata.create_all(engine)
+
+
+def bulk_insert_activities(bind, rows: list[dict]) -> None:
+    """
+    Insert many extracted activities with one executemany.
+
+    Args:
+        bind: SQLAlchemy Engine (the insert runs in its own transaction), or a
+            Session/Connection whose current transaction the insert joins
+        rows: Column-name -> value mappings for ExtractedActivities
+    """
+    if not rows:
+        return
+
+    stmt = ExtractedActivities.__table__.insert()
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            conn.execute(stmt, rows)
+    else:
+        bind.execute(stmt, rows)
@@ -1,21 +1,33 @@
 """Core execution logic for processor engine."""
 
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from typing import Optional
 
-from .database import get_db_engine, create_tables
 from .preprocessor import DocumentPreprocessor
 from .ocr_extractor import OCRExtractor
 from .table_detector import TableDetector
 from .parser import TimetableParser
-from .models import TimetableDocument
+from .models import OCRBatch, TimetableDocument, TimetableEntry, Weekday
+from .utils import prefetch
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the 'fast' extra
+    orjson = None
 
 # Supported file extensions
 SUPPORTED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.pdf', '.docx', '.bmp', '.tiff', '.tif'}
 
+# Pages handed to OCRExtractor.extract_text_batch() per call; small groups
+# keep batched inference without waiting for the whole document
+_OCR_BATCH_PAGES = 2
+
 
-def process_timetable(file_path: str, use_gpu: bool = False) -> TimetableDocument:
+def process_timetable(file_path: str, use_gpu: bool = False, cache_dir: Optional[str] = None) -> TimetableDocument:
     """
     Process a single timetable file and extract structured data.
 
@@ -24,7 +36,9 @@ def process_timetable(file_path: str, use_gpu: bool = False) -> TimetableDocumen
 
     Args:
         file_path: Absolute or relative path to the timetable file
-        use_gpu: Whether to use GPU acceleration for OCR (default: False)
+        use_gpu: Whether to use GPU acceleration for preprocessing and OCR (default: False)
+        cache_dir: Optional directory for caching preprocessed pages between
+            runs on the same file (see DocumentPreprocessor)
 
     Returns:
         TimetableDocument containing extracted entries
@@ -51,36 +65,54 @@ def process_timetable(file_path: str, use_gpu: bool = False) -> TimetableDocumen
         print(f"▶ Processing Timetable: {file_path.name}")
         # print(f"{'='*60}")
 
-        # Step 1: Preprocess document (convert to images)
+        # Step 1: Preprocess document (convert to images). Pages are prepared
+        # in a background thread so page N+1 is being converted/denoised
+        # while page N is being analyzed.
         print("\n[1/5] Preprocessing document...")
-        preprocessor = DocumentPreprocessor()
-        images = preprocessor.process(file_path)
-        print(f"✓ Converted to {len(images)} image(s)")
+        preprocessor = DocumentPreprocessor(use_gpu=use_gpu, cache_dir=cache_dir)
+        pages = prefetch(preprocessor.iter_pages(file_path), depth=2)
+
+        # Steps 2-3: OCR and table detection use independent models, so they
+        # run at the same time on one thread each. Pages are OCR'd in small
+        # batches as they arrive; table detection runs per page. Each batch
+        # is finished before more pages are pulled, so only one batch of
+        # preprocessed pages is held here besides the prefetch queue.
+        ocr_extractor = _get_ocr_extractor(use_gpu)
+        table_detector = TableDetector(use_gpu=use_gpu)
+
+        page_ocr_data = []
+        page_tables = []
+        try:
+            with (
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix='ocr') as ocr_executor,
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix='tables') as table_executor,
+            ):
+                while batch := list(islice(pages, _OCR_BATCH_PAGES)):
+                    ocr_future = ocr_executor.submit(ocr_extractor.extract_text_batch, batch)
+                    table_futures = [table_executor.submit(table_detector.detect_tables, image) for image in batch]
+                    page_ocr_data.extend(ocr_future.result())
+                    page_tables.extend(future.result() for future in table_futures)
+        finally:
+            # If OCR or table detection failed, stop the preprocessing thread
+            # now instead of leaving it blocked on the queue with its pages
+            # and the open document
+            pages.close()
+        page_count = len(page_tables)
+        print(f"✓ Converted to {page_count} image(s)")
 
-        # Step 2: Extract text using OCR
         print("\n[2/5] Extracting text with PaddleOCR...")
-        ocr_extractor = OCRExtractor(use_gpu=use_gpu)
-        
-        all_ocr_data = []
-        for idx, image in enumerate(images):
-            print(f"  → Processing page {idx + 1}/{len(images)}...")
-            ocr_data = ocr_extractor.extract_text(image)
-            all_ocr_data.extend(ocr_data)
-            print(f"    Extracted {len(ocr_data)} text elements")
+        for idx, ocr_data in enumerate(page_ocr_data):
+            print(f"  → Page {idx + 1}/{page_count}: extracted {len(ocr_data)} text elements")
+        all_ocr_data = OCRBatch.concat(page_ocr_data)
         
         avg_confidence = ocr_extractor.calculate_confidence_score(all_ocr_data)
         print(f"✓ OCR completed (avg confidence: {avg_confidence:.2%})")
 
-        # Step 3: Detect tables
         print("\n[3/5] Detecting tables with img2table...")
-        table_detector = TableDetector(use_gpu=use_gpu)
-        
         all_tables = []
-        for idx, image in enumerate(images):
-            print(f"  → Analyzing page {idx + 1}/{len(images)}...")
-            tables = table_detector.detect_tables(image)
+        for idx, tables in enumerate(page_tables):
             all_tables.extend(tables)
-            print(f"    Found {len(tables)} table(s)")
+            print(f"  → Page {idx + 1}/{page_count}: found {len(tables)} table(s)")
         
         print(f"✓ Detected {len(all_tables)} total table(s)")
 
@@ -115,15 +147,29 @@ def process_timetable(file_path: str, use_gpu: bool = False) -> TimetableDocumen
         raise
 
 
-def save_to_json(document: TimetableDocument, output_path: str) -> None:
+@lru_cache(maxsize=2)
+def _get_ocr_extractor(use_gpu: bool) -> OCRExtractor:
+    """Return a shared OCRExtractor so the PaddleOCR models are loaded once."""
+    return OCRExtractor(use_gpu=use_gpu)
+
+
+def save_to_json(document: TimetableDocument, output_path: str, verbose: bool = True) -> None:
     """
     Save extracted timetable data to JSON file.
 
+    Entries are encoded and written one at a time, so the full document is
+    never held in memory as a nested dict. Uses orjson when it is installed
+    (``pip install processor-engine[fast]``) and falls back to the standard
+    library otherwise. Both produce equivalent JSON with the same layout, but
+    not always the same bytes: orjson formats some floats differently
+    (``0.00001`` rather than ``1e-05``) and writes NaN as ``null``.
+
     Args:
         document: TimetableDocument to save
         output_path: Path to output JSON file
+        verbose: Print a confirmation line once the file is written
     """
-    data = {
+    header = {
         'file_path': document.file_path,
         'metadata': {
             'class_name': document.class_name,
@@ -132,28 +178,52 @@ def save_to_json(document: TimetableDocument, output_path: str) -> None:
             'school_name': document.school_name,
             'extraction_timestamp': document.extraction_timestamp,
         },
-        'entries': [
-            {
-                'weekday': entry.weekday.value if entry.weekday else None,
-                'timeslot': {
-                    'start_time': entry.timeslot.start_time.isoformat() if entry.timeslot and entry.timeslot.start_time else None,
-                    'end_time': entry.timeslot.end_time.isoformat() if entry.timeslot and entry.timeslot.end_time else None,
-                    'raw_text': entry.timeslot.raw_text if entry.timeslot else None,
-                },
-                'activity': entry.activity,
-                'notes': entry.notes,
-                'subject': entry.subject,
-                'location': entry.location,
-                'confidence_score': entry.confidence_score,
-            }
-            for entry in document.entries
-        ]
     }
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    with open(output_path, 'wb') as f:
+        # Reopen the header object (drop its closing "\n}") to append entries
+        f.write(_dumps(header)[:-2])
+        f.write(b',\n  "entries": [')
+        for idx, entry in enumerate(document.entries):
+            f.write(b'\n    ' if idx == 0 else b',\n    ')
+            f.write(_dumps(_entry_to_dict(entry)).replace(b'\n', b'\n    '))
+        f.write(b'\n  ]\n}' if document.entries else b']\n}')
     
-    print(f"✓ Saved to: {output_path}")
+    if verbose:
+        print(f"✓ Saved to: {output_path}")
+
+
+def _dumps(obj) -> bytes:
+    """Encode obj as UTF-8 JSON with 2-space indentation."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _entry_to_dict(entry: TimetableEntry) -> dict:
+    """Convert a TimetableEntry to its JSON representation."""
+    weekday = entry.weekday
+    timeslot = entry.timeslot
+    if timeslot:
+        start_time = timeslot.start_time
+        end_time = timeslot.end_time
+        timeslot_data = {
+            'start_time': start_time.isoformat() if start_time else None,
+            'end_time': end_time.isoformat() if end_time else None,
+            'raw_text': timeslot.raw_text,
+        }
+    else:
+        timeslot_data = {'start_time': None, 'end_time': None, 'raw_text': None}
+
+    return {
+        'weekday': weekday.value if weekday else None,
+        'timeslot': timeslot_data,
+        'activity': entry.activity,
+        'notes': entry.notes,
+        'subject': entry.subject,
+        'location': entry.location,
+        'confidence_score': entry.confidence_score,
+    }
 
 
 def _print_document_summary(document: TimetableDocument) -> None:
@@ -171,10 +241,10 @@ def _print_document_summary(document: TimetableDocument) -> None:
     
     print(f"\n  Total Entries: {len(document.entries)}")
     
-    # Group by weekday
-    from .models import Weekday
+    # Group by weekday (one pass over the entries)
+    by_day = document.entries_by_day()
     for day in Weekday:
-        entries = document.get_entries_by_day(day)
+        entries = by_day.get(day)
         if entries:
             print(f"    {day.value}: {len(entries)} entries")
     
@@ -4,6 +4,9 @@ from dataclasses import dataclass, field
 from datetime import time
 from typing import Optional
 from enum import Enum
+from functools import wraps
+from types import MappingProxyType
+import numpy as np
 
 
 class Weekday(Enum):
@@ -30,25 +33,22 @@ class Weekday(Enum):
         if not day_str or not isinstance(day_str, str):
             return None
         
-        day_str = day_str.strip().upper()
-        
-        if not day_str:
-            return None
-        
-        day_mapping = {
-            'M': cls.MONDAY, 'MON': cls.MONDAY, 'MONDAY': cls.MONDAY,
-            'TU': cls.TUESDAY, 'TUE': cls.TUESDAY, 'TUES': cls.TUESDAY, 'TUESDAY': cls.TUESDAY,
-            'W': cls.WEDNESDAY, 'WED': cls.WEDNESDAY, 'WEDNESDAY': cls.WEDNESDAY,
-            'TH': cls.THURSDAY, 'THU': cls.THURSDAY, 'THUR': cls.THURSDAY, 'THURS': cls.THURSDAY, 'THURSDAY': cls.THURSDAY,
-            'F': cls.FRIDAY, 'FRI': cls.FRIDAY, 'FRIDAY': cls.FRIDAY,
-            'SA': cls.SATURDAY, 'SAT': cls.SATURDAY, 'SATURDAY': cls.SATURDAY,
-            'SU': cls.SUNDAY, 'SUN': cls.SUNDAY, 'SUNDAY': cls.SUNDAY,
-        }
-        
-        return day_mapping.get(day_str)
+        return _DAY_MAP.get(day_str.strip().upper())
 
 
-@dataclass
+# Accepted weekday spellings (upper-cased), built once at import time
+_DAY_MAP = MappingProxyType({
+    'M': Weekday.MONDAY, 'MON': Weekday.MONDAY, 'MONDAY': Weekday.MONDAY,
+    'TU': Weekday.TUESDAY, 'TUE': Weekday.TUESDAY, 'TUES': Weekday.TUESDAY, 'TUESDAY': Weekday.TUESDAY,
+    'W': Weekday.WEDNESDAY, 'WED': Weekday.WEDNESDAY, 'WEDNESDAY': Weekday.WEDNESDAY,
+    'TH': Weekday.THURSDAY, 'THU': Weekday.THURSDAY, 'THUR': Weekday.THURSDAY, 'THURS': Weekday.THURSDAY, 'THURSDAY': Weekday.THURSDAY,
+    'F': Weekday.FRIDAY, 'FRI': Weekday.FRIDAY, 'FRIDAY': Weekday.FRIDAY,
+    'SA': Weekday.SATURDAY, 'SAT': Weekday.SATURDAY, 'SATURDAY': Weekday.SATURDAY,
+    'SU': Weekday.SUNDAY, 'SUN': Weekday.SUNDAY, 'SUNDAY': Weekday.SUNDAY,
+})
+
+
+@dataclass(slots=True)
 class TimeSlot:
     """Represents a time slot in the timetable."""
     start_time: Optional[time] = None
@@ -61,7 +61,7 @@ class TimeSlot:
         return self.raw_text
 
 
-@dataclass
+@dataclass(slots=True)
 class TimetableEntry:
     """Represents a single timetable entry/activity."""
     weekday: Optional[Weekday] = None
@@ -80,7 +80,7 @@ class TimetableEntry:
         return f"{day} {time}: {self.activity}"
 
 
-@dataclass
+@dataclass(slots=True)
 class TimetableDocument:
     """Represents the complete extracted timetable."""
     file_path: str
@@ -101,5 +101,93 @@ class TimetableDocument:
         """Get all entries for a specific weekday."""
         return [entry for entry in self.entries if entry.weekday == weekday]
     
+    def entries_by_day(self) -> dict[Optional[Weekday], list[TimetableEntry]]:
+        """
+        Group all entries by weekday in a single pass.
+        
+        Prefer this over calling get_entries_by_day() once per weekday.
+        Days appear in order of first occurrence; entries keep document order.
+        """
+        groups: dict[Optional[Weekday], list[TimetableEntry]] = {}
+        for entry in self.entries:
+            groups.setdefault(entry.weekday, []).append(entry)
+        return groups
+    
     def __len__(self) -> int:
         return len(self.entries)
+
+
+class OCRBatch(list):
+    """
+    OCR text elements with their numeric fields also stored column-wise.
+    
+    Behaves exactly like the list of element dicts returned by
+    OCRExtractor.extract_text(); ``positions`` (n, 2) and ``confidences`` (n,)
+    hold the same values as contiguous arrays so row grouping and
+    confidence statistics can scan them without walking the dicts.
+    Any in-place change to the list (append, sort, item assignment, ...)
+    drops the arrays (sets them to None), after which the batch is treated
+    as a plain list; use from_elements() to rebuild them.
+    """
+    __slots__ = ('positions', 'confidences')
+    
+    def __init__(self, elements=(), positions=None, confidences=None):
+        super().__init__(elements)
+        self.positions = None if positions is None else np.asarray(positions, dtype=np.float64)
+        self.confidences = None if confidences is None else np.asarray(confidences, dtype=np.float64)
+    
+    def copy(self) -> "OCRBatch":
+        return OCRBatch(self, self.positions, self.confidences)
+    
+    def __reduce__(self):
+        return (OCRBatch, (list(self), self.positions, self.confidences))
+    
+    @classmethod
+    def concat(cls, batches) -> "OCRBatch":
+        """Join per-page results, keeping the column arrays when available."""
+        batches = [b if is_columnar(b) else cls.from_elements(b) for b in batches]
+        if not batches:
+            return cls()
+        return cls(
+            [item for batch in batches for item in batch],
+            np.concatenate([b.positions.reshape(-1, 2) for b in batches]),
+            np.concatenate([b.confidences.reshape(-1) for b in batches]),
+        )
+    
+    @classmethod
+    def from_elements(cls, elements) -> "OCRBatch":
+        """Build the column arrays from plain element dicts."""
+        elements = list(elements)
+        n = len(elements)
+        positions = np.array([item['position'] for item in elements], dtype=np.float64).reshape(n, 2)
+        confidences = np.fromiter((item['confidence'] for item in elements), dtype=np.float64, count=n)
+        return cls(elements, positions, confidences)
+
+
+def _dropping_columns(name: str):
+    """Wrap the list method ``name`` so calling it drops an OCRBatch's arrays."""
+    method = getattr(list, name)
+    
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.positions = self.confidences = None
+        return method(self, *args, **kwargs)
+    
+    return wrapper
+
+
+for _name in ('__setitem__', '__delitem__', '__iadd__', '__imul__', 'append', 'extend',
+              'insert', 'pop', 'remove', 'clear', 'sort', 'reverse'):
+    setattr(OCRBatch, _name, _dropping_columns(_name))
+del _name
+
+
+def is_columnar(data) -> bool:
+    """True if data is an OCRBatch whose arrays are in sync with its items."""
+    return (
+        isinstance(data, OCRBatch)
+        and data.positions is not None
+        and data.confidences is not None
+        and len(data.positions) == len(data)
+        and len(data.confidences) == len(data)
+    )
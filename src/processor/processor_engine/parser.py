@@ -1,10 +1,498 @@
 """Parser to extract structured timetable data from OCR and table results."""
 
 import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from datetime import time, datetime
-from typing import List, Dict, Optional, Tuple
-from .models import TimetableEntry, TimetableDocument, Weekday, TimeSlot
-from .utils import normalize_activity_name
+from functools import lru_cache
+from typing import List, Dict, NamedTuple, Optional, Tuple
+import numpy as np
+from .models import TimetableEntry, TimetableDocument, Weekday, TimeSlot, is_columnar
+from .utils import find_row_starts, normalize_activity_name
+
+__all__ = ['TimetableParser']
+
+
+# Metadata patterns
+# Class pattern (e.g., "Class: 2EJ", "2EJ", "4M")
+_CLASS_RE = re.compile(r'class[:\s]+([a-z0-9]+)|^(\d[a-z]{1,3})\b', re.IGNORECASE)
+# Teacher pattern (e.g., "Teacher: Miss Joynes", "Miss Joynes", "Mr. Smith")
+_TEACHER_RE = re.compile(r'teacher[:\s]+((?:miss|mrs|mr|ms)\.?\s+\w+)', re.IGNORECASE)
+# Term pattern (e.g., "Autumn 2 2024", "Spring 2 Week: 2")
+_TERM_RE = re.compile(r'(autumn|spring|summer)\s*\d+\s*(?:week[:\s]+\d+)?\s*\d{4}', re.IGNORECASE)
+# School pattern
+_SCHOOL_RE = re.compile(r'([a-z\s]+(?:primary|secondary|school))', re.IGNORECASE)
+# Every _SCHOOL_RE match contains one of these words. The literal scan is
+# linear, while _SCHOOL_RE backtracks quadratically over long runs of letters
+# that are not followed by one of them.
+_SCHOOL_HINT_RE = re.compile(r'primary|secondary|school', re.IGNORECASE)
+
+# Strict patterns to avoid matching plain numbers like years or class codes
+#  - explicit HH:MM or H.MM
+#  - H am/pm
+#  - ranges like 9-10, 9:30-10, 9.30 to 10.15
+_CONTAINS_TIME_RE = re.compile(
+    r'\b\d{1,2}[:.]\d{2}\b'
+    r'|\b\d{1,2}\s*(am|pm)\b'
+    r'|\b\d{1,2}(?::\d{2})?\s*(?:-|–|—|to)\s*\d{1,2}(?::\d{2})?\b'
+)
+# Every _CONTAINS_TIME_RE alternative needs a digit; this single-class scan
+# rejects plain words (most activity cells) without running the alternation
+_DIGIT_RE = re.compile(r'\d')
+_TIME_ONLY_STRIP_RE = re.compile(r'[\d:.\-–—\s]+(?:am|pm)?', re.IGNORECASE)
+
+# parse_timeslot patterns
+# Dash variants OCR produces for ranges, mapped to '-' in one translate() pass
+_DASH_TRANS = str.maketrans({'\u2012': '-', '\u2013': '-', '\u2014': '-', '\u2212': '-'})
+_DOT_SEPARATOR_RE = re.compile(r'(?<=\d)\.(?=\d{2}\b)')
+# Python's `re` requires fixed-width lookbehind, so the ':' prefix is captured instead
+_LETTER_O_MINUTE_RE = re.compile(r'(:\s?)[Oo](?=\b)', re.IGNORECASE)
+# Same alternatives as _CONTAINS_TIME_RE, matched case-insensitively in one pass
+_LOOKS_LIKE_TIME_RE = re.compile(_CONTAINS_TIME_RE.pattern, re.IGNORECASE)
+_TIME_RANGE_RE = re.compile(r"(\d{1,2}(?::|\.)?\d{0,2})\s*(?:-|–|—|to)\s*(\d{1,2}(?::|\.)?\d{0,2})(?:\s*(am|pm|AM|PM))?")
+_TRAILING_AMPM_RE = re.compile(r'(am|pm|AM|PM)$')
+_NON_DIGIT_RE = re.compile(r'\D')
+# Flexible time token: hours with optional minutes and optional am/pm
+_TIME_TOKEN_RE = re.compile(r'(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm|AM|PM)?')
+
+
+# Cell texts (weekday names, times, subjects) recur many times per document,
+# so the pure string checks below are memoized.
+@lru_cache(maxsize=4096)
+def _text_weekday(text: str) -> Optional[Weekday]:
+    return Weekday.from_string(text)
+
+
+def _text_contains_weekday(text: str) -> bool:
+    return _text_weekday(text) is not None
+
+
+def _row_weekday(row: List[Dict[str, any]]) -> Optional[Weekday]:
+    """First weekday named by the items of an OCR row, if any."""
+    for item in row:
+        wd = _text_weekday(item.get('text', ''))
+        if wd:
+            return wd
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _text_contains_time(text: str) -> bool:
+    if _DIGIT_RE.search(text) is None:
+        return False
+    return _CONTAINS_TIME_RE.search(text.lower()) is not None
+
+
+@lru_cache(maxsize=4096)
+def _text_is_time_only(text: str) -> bool:
+    cleaned = _TIME_ONLY_STRIP_RE.sub('', text)
+    return len(cleaned.strip()) < 2
+
+
+@lru_cache(maxsize=4096)
+def _text_is_activity(text: str, activity_re: re.Pattern) -> bool:
+    text_lower = text.lower().strip()
+    
+    if len(text_lower) < 2:
+        return False
+    
+    # Check against known activity keywords
+    if activity_re.search(text_lower):
+        return True
+    
+    # If it's not a weekday or time, and has reasonable length, consider it an activity
+    if (not _text_contains_weekday(text) and 
+        not _text_is_time_only(text) and 
+        len(text_lower) >= 3):
+        return True
+    
+    return False
+
+
+# Labels of header/metadata text ('Class: 2EJ', 'Teacher: ...'), matched on lowercased text
+_METADATA_LABEL_RE = re.compile(r'class:|teacher|term|school')
+
+# Cell values img2table/pandas produce for empty cells
+_PLACEHOLDER_CELLS = frozenset({'', 'nan', 'none'})
+_PLACEHOLDER_MAX_LEN = max(map(len, _PLACEHOLDER_CELLS))
+
+# Monday..Sunday order, used when rebuilding and sorting entries
+_WEEKDAY_LIST = list(Weekday)
+_WEEKDAY_ORDER: Dict[Weekday, int] = {wd: i for i, wd in enumerate(_WEEKDAY_LIST)}
+
+
+def _clean_row(row: List[str]) -> List[str]:
+    """Strip every cell of a table row, blanking placeholder values."""
+    cleaned = []
+    for cell in row:
+        text = cell.strip()
+        # empty cells need no lookup; lower() never shortens a string, so
+        # longer cells can't be placeholders either
+        if text and len(text) <= _PLACEHOLDER_MAX_LEN and text.lower() in _PLACEHOLDER_CELLS:
+            text = ''
+        cleaned.append(text)
+    return cleaned
+
+
+def _time_to_minutes(t: time) -> int:
+    """Minutes since midnight."""
+    return t.hour * 60 + t.minute
+
+
+def _safe_time(h: int, m: int) -> Optional[time]:
+    """time(h, m), or None when either field is out of range."""
+    if 0 <= h < 24 and 0 <= m < 60:
+        return time(h, m)
+    return None
+
+
+@lru_cache(maxsize=2048)
+def _minutes_to_time(m: int) -> time:
+    """Inverse of _time_to_minutes(), wrapping past midnight."""
+    h, mm = divmod(m, 60)
+    return time(h % 24, mm)
+
+
+# Cell classification flags (see _classify_cell)
+_CELL_WEEKDAY = 1
+_CELL_TIME = 2
+_CELL_ACTIVITY = 4
+_CELL_TIME_ONLY = 8
+
+
+# Canonical default blocks inserted by _normalize_and_fill_defaults
+_DEFAULT_BLOCKS = (
+    ("Registration and Early Morning work", time(8, 35), time(8, 50)),
+    ("Break", time(10, 20), time(10, 35)),
+    ("Lunch", time(12, 0), time(13, 0)),
+    ("Storytime", time(15, 0), time(15, 15)),
+)
+# Lower-cased label and start/end minutes of each default block, for matching
+_DEFAULT_BLOCK_KEYS = tuple(
+    (label.lower(), _time_to_minutes(st), _time_to_minutes(et)) for label, st, et in _DEFAULT_BLOCKS
+)
+
+
+def _day_activity_index(day_entries: List[TimetableEntry]) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Lower-case each activity of a day once for the default-block checks.
+    
+    Returns (activity_lc, start_min, end_min) per entry with an activity;
+    the minutes are None unless the entry has both a start and an end time.
+    """
+    index = []
+    for e in day_entries:
+        if not e.activity:
+            continue
+        ts = e.timeslot
+        if ts and ts.start_time and ts.end_time:
+            index.append((e.activity.lower(), _time_to_minutes(ts.start_time), _time_to_minutes(ts.end_time)))
+        else:
+            index.append((e.activity.lower(), None, None))
+    return index
+
+
+def _has_block(day_index: List[Tuple[str, Optional[int], Optional[int]]], label_lc: str, st_min: int, et_min: int) -> bool:
+    """Check if a block exists for a given day (see _day_activity_index())."""
+    for activity_lc, start_min, end_min in day_index:
+        if label_lc in activity_lc:
+            # match by name only if times missing; consider it present
+            if start_min is None or (start_min < et_min and st_min < end_min):
+                return True
+    return False
+
+
+def _entry_start_key(e: TimetableEntry) -> int:
+    """Sort key within a day: start minute, undated entries last."""
+    if e.timeslot and e.timeslot.start_time:
+        return _time_to_minutes(e.timeslot.start_time)
+    return 10_000
+
+
+@lru_cache(maxsize=4096)
+def _classify_cell(text: str, activity_re: re.Pattern) -> int:
+    """Return the _CELL_* flags of a non-empty cell text in one lookup."""
+    flags = 0
+    if _text_contains_weekday(text):
+        flags |= _CELL_WEEKDAY
+    if _text_contains_time(text):
+        flags |= _CELL_TIME
+    if _text_is_activity(text, activity_re):
+        flags |= _CELL_ACTIVITY
+    if _text_is_time_only(text):
+        flags |= _CELL_TIME_ONLY
+    return flags
+
+
+def _ref_key_index(starts: Tuple[Optional[time], ...], key) -> Tuple[List[int], List[int]]:
+    """
+    Sorted distinct key(start) values of the reference start times that are set.
+    
+    Each key is paired with the position of the first reference producing it,
+    so nearest-reference searches can break ties the way a scan in list
+    order would.
+    """
+    first: Dict[int, int] = {}
+    for i, st in enumerate(starts):
+        if st:
+            first.setdefault(key(st), i)
+    keys = sorted(first)
+    return keys, [first[k] for k in keys]
+
+
+def _nearest_ref(index: Tuple[List[int], List[int]], value: int) -> Optional[Tuple[int, int]]:
+    """(distance, reference position) of the key nearest value; earliest reference on ties."""
+    keys, first = index
+    i = bisect_left(keys, value)
+    best = None
+    for j in (i - 1, i):
+        if 0 <= j < len(keys):
+            cand = (abs(keys[j] - value), first[j])
+            if best is None or cand < best:
+                best = cand
+    return best
+
+
+class _ReferenceIndex:
+    """
+    Reference start times prepared once for parse_timeslot's am/pm inference.
+    
+    ``starts`` holds each reference's start time (None when missing) and is
+    the memo key; ``minutes`` and ``hours12`` are the sorted indexes searched
+    by _nearest_ref(). Table parsers build one per table and pass it as
+    reference_times instead of the TimeSlot list.
+    """
+    __slots__ = ('starts', 'minutes', 'hours12')
+    
+    def __init__(self, starts: Tuple[Optional[time], ...]):
+        self.starts = starts
+        self.minutes = _ref_key_index(starts, _time_to_minutes)
+        self.hours12 = _ref_key_index(starts, lambda st: st.hour % 12)
+    
+    @staticmethod
+    def for_slots(reference_times: Optional[List[TimeSlot]]) -> "_ReferenceIndex":
+        """Index of the start times of a TimeSlot list (shared per distinct list)."""
+        starts = tuple(ref.start_time if ref else None for ref in reference_times) if reference_times else ()
+        return _reference_index(starts)
+    
+    def best_hour24(self, h0: int, minute: int) -> int:
+        """Pick h0 or h0+12 (mod 24), whichever lands nearer a reference start."""
+        cand1 = h0 % 24
+        cand2 = (h0 + 12) % 24
+        near1 = _nearest_ref(self.minutes, cand1 * 60 + minute)
+        if near1 is None:
+            return cand1
+        near2 = _nearest_ref(self.minutes, cand2 * 60 + minute)
+        return cand1 if near1 <= near2 else cand2
+
+
+@lru_cache(maxsize=256)
+def _reference_index(starts: Tuple[Optional[time], ...]) -> _ReferenceIndex:
+    return _ReferenceIndex(starts)
+
+
+def _parse_timeslot_uncached(text: str, ref_index: _ReferenceIndex) -> Optional[TimeSlot]:
+    """Parse a timeslot from text; see TimetableParser.parse_timeslot()."""
+    text = text.strip()
+    
+    if not text:
+        return None
+    
+    # Pre-normalize text to reduce OCR noise and support a wider range of separators
+    # - normalize various dash characters to '-' so ranges are caught
+    # - convert dots between hour/min to ':' (OCR commonly uses '.' for ':')
+    # - collapse multiple spaces
+    norm = text.translate(_DASH_TRANS)
+    # replace lone dot used as separator (e.g., '9.30') with ':' but avoid replacing decimal dots in numbers
+    norm = _DOT_SEPARATOR_RE.sub(':', norm)
+    # common OCR mistakes: letter O for zero in minute positions
+    norm = _LETTER_O_MINUTE_RE.sub(r'\g<1>0', norm)
+    norm = ' '.join(norm.split())
+
+    # If the text doesn't look like a time at all (no separators / am/pm / range), bail early
+    looks_like_time = _LOOKS_LIKE_TIME_RE.search(norm) is not None
+
+    if not looks_like_time and not ref_index.starts:
+        # Avoid interpreting arbitrary numbers (e.g., years "2024", class "2EJ") as times
+        return None
+
+    # First attempt: look for explicit ranges like '1:15 - 2:15', '9.30 to 10:15', '1 - 2pm'
+    # (dashes were translated to '-' above, so a range needs '-' or 'to')
+    mrange = _TIME_RANGE_RE.search(norm) if '-' in norm or 'to' in norm else None
+    if mrange:
+        left = mrange.group(1)
+        right = mrange.group(2)
+        trailing_ampm = mrange.group(3)
+
+        # normalize separators to ':' for consistent parsing
+        left = left.replace('.', ':')
+        right = right.replace('.', ':')
+
+        def _split_time_token(tok: str):
+            if ':' in tok:
+                h, mm = tok.split(':', 1)
+                mm = mm[:2] if mm else '00'
+            else:
+                h = tok
+                mm = '00'
+            return int(_NON_DIGIT_RE.sub('', h)), int(_NON_DIGIT_RE.sub('', mm))
+
+        lh, lm = _split_time_token(left)
+        rh, rm = _split_time_token(right)
+
+        # prepare am/pm propagation
+        left_ampm = None
+        right_ampm = trailing_ampm
+        # If explicit AM/PM present inside tokens (rare), try to extract
+        inner_left = _TRAILING_AMPM_RE.search(left)
+        inner_right = _TRAILING_AMPM_RE.search(right)
+        if inner_left:
+            left_ampm = inner_left.group(1)
+        if inner_right:
+            right_ampm = inner_right.group(1)
+
+        # A range carrying am/pm on either side is left to the token-based
+        # parsing below, which maps both ends with _map_hour()
+        if not left_ampm and not right_ampm:
+            sh, eh = lh, rh
+            # No am/pm: if reference_times exist, choose mapping (h or h+12)
+            if ref_index.starts:
+                sh = ref_index.best_hour24(lh, lm)
+                eh = ref_index.best_hour24(rh, rm)
+
+            start_time = _safe_time(sh, lm)
+            end_time = _safe_time(eh, rm)
+            # out-of-range fields fall through to token-based parsing
+            if start_time is not None and end_time is not None:
+                # ensure end > start, otherwise if end <= start assume +1 hour
+                start_min = _time_to_minutes(start_time)
+                if _time_to_minutes(end_time) <= start_min:
+                    end_time = _minutes_to_time(start_min + 60)
+
+                return TimeSlot(start_time=start_time, end_time=end_time, raw_text=text.strip())
+
+    # Find all time-like tokens in the (normalized) text
+    matches = list(_TIME_TOKEN_RE.finditer(norm))
+
+    def _map_hour(h: int, ampm: Optional[str]) -> int:
+        # Map 12-hour hour and am/pm to 24-hour
+        if ampm:
+            am = ampm.lower() == 'am'
+            pm = ampm.lower() == 'pm'
+            if am and h == 12:
+                return 0
+            if pm and h < 12:
+                return h + 12
+            return h % 24
+        # No am/pm provided — we'll infer later
+        return h
+
+    times = []
+    for m in matches:
+        h = int(m.group(1))
+        mm = int(m.group(2)) if m.group(2) else 0
+        ampm = m.group(3)
+        times.append({'hour': h, 'minute': mm, 'ampm': ampm})
+
+    if len(times) >= 2:
+        # Treat first two as a range
+        s = times[0]
+        e = times[1]
+
+        # If either has am/pm, propagate to the other if missing
+        if s['ampm'] and not e['ampm']:
+            e['ampm'] = s['ampm']
+        if e['ampm'] and not s['ampm']:
+            s['ampm'] = e['ampm']
+
+        # If still missing am/pm and reference times provided, try to infer
+        def _resolve(t, refs):
+            if t['ampm']:
+                return _map_hour(t['hour'], t['ampm']), t['minute']
+            # Try to infer using reference_times (compare nearest minute)
+            if refs:
+                h12 = t['hour'] % 12
+                near_am = _nearest_ref(ref_index.minutes, h12 * 60 + t['minute'])
+                if near_am is not None:
+                    near_pm = _nearest_ref(ref_index.minutes, (h12 + 12) * 60 + t['minute'])
+                    return (h12 if near_am[0] <= near_pm[0] else h12 + 12), t['minute']
+            # Fallback heuristic: morning hours 7-11 -> AM, else PM (12->12)
+            if 7 <= t['hour'] <= 11:
+                return t['hour'] % 24, t['minute']
+            if t['hour'] == 12:
+                return 12, t['minute']
+            return (t['hour'] + 12) % 24, t['minute']
+
+        sh, sm = _resolve(s, ref_index.starts)
+        eh, em = _resolve(e, ref_index.starts)
+        start_time = _safe_time(sh, sm)
+        end_time = _safe_time(eh, em)
+        if start_time is not None and end_time is not None:
+            return TimeSlot(start_time=start_time, end_time=end_time, raw_text=text.strip())
+
+    if len(times) == 1:
+        t = times[0]
+        # resolve hour
+        if t['ampm']:
+            h24 = _map_hour(t['hour'], t['ampm'])
+        else:
+            # infer from reference_times or heuristics
+            if ref_index.starts:
+                # pick closest reference hour
+                near = _nearest_ref(ref_index.hours12, t['hour'])
+                best = ref_index.starts[near[1]].hour if near else None
+                if best is not None:
+                    # choose mapping closest to best (either h or h+12)
+                    if abs(t['hour'] - (best % 12)) <= abs((t['hour'] + 12) - best):
+                        h24 = t['hour'] % 24
+                    else:
+                        h24 = (t['hour'] + 12) % 24
+                else:
+                    # fallback heuristic
+                    if 7 <= t['hour'] <= 11:
+                        h24 = t['hour'] % 24
+                    elif t['hour'] == 12:
+                        h24 = 12
+                    else:
+                        h24 = (t['hour'] + 12) % 24
+            else:
+                if 7 <= t['hour'] <= 11:
+                    h24 = t['hour'] % 24
+                elif t['hour'] == 12:
+                    h24 = 12
+                else:
+                    h24 = (t['hour'] + 12) % 24
+
+        start_time = _safe_time(h24, t['minute'])
+        if start_time is not None:
+            return TimeSlot(start_time=start_time, raw_text=text.strip())
+    
+    # Return raw text if parseable times not found but text looks time-related
+    if _text_contains_time(text):
+        return TimeSlot(raw_text=text.strip())
+    
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_timeslot_cached(text: str, ref_starts: Tuple[Optional[time], ...]) -> Optional[Tuple[Optional[time], Optional[time], str]]:
+    """
+    Memoized parse keyed on the text and the reference start times.
+    
+    Only the start times of the references are consulted by the parser, so
+    they stand in for the TimeSlot objects. The result is returned as a
+    plain tuple because TimeSlot is mutable and callers adjust it in place.
+    """
+    ts = _parse_timeslot_uncached(text, _reference_index(ref_starts))
+    if ts is None:
+        return None
+    return ts.start_time, ts.end_time, ts.raw_text
+
+
+class _OCRScan(NamedTuple):
+    """What the parser needs from one walk over the OCR items."""
+    time_items: List[Tuple[float, float, float, str]]  # (norm_y, norm_x, center_px, text) above y=0.5
+    image_width: float
 
 
 class TimetableParser:
@@ -14,7 +502,7 @@ class TimetableParser:
         """Initialize the parser with regex patterns."""
         # Flexible time detection (hours with optional minutes and optional am/pm)
         # Examples matched: '9', '9:00', '09.30', '1pm', '1:15 pm'
-        self._time_re = re.compile(r'(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm|AM|PM)?')
+        self._time_re = _TIME_TOKEN_RE
         
         # Activity indicators (common subjects/activities)
         self.activity_keywords = {
@@ -26,6 +514,11 @@ class TimetableParser:
             'outdoor', 'indoor', 'swimming', 're', 'religious education',
             'drama', 'dance', 'spanish', 'french', 'pshe', 'library', 'meeting', 'rwi', 'yoga'
         }
+        # Single alternation so _is_activity scans each cell once instead of
+        # once per keyword (longest first so overlapping keywords behave alike)
+        self._activity_re = re.compile(
+            '|'.join(map(re.escape, sorted(self.activity_keywords, key=len, reverse=True)))
+        )
     
     def parse_document(
         self, 
@@ -48,6 +541,7 @@ class TimetableParser:
         
         # Extract metadata from OCR data
         self._extract_metadata(doc, ocr_data)
+        scan = self._scan_ocr(ocr_data)
         
         # Parse tables if available (preferred method)
         if table_data:
@@ -58,7 +552,7 @@ class TimetableParser:
             # Try a smarter OCR-only fallback that infers column time slots from
             # header time tokens and maps OCR boxes into those columns. If that
             # fails, fall back to the older row-based OCR parser.
-            entries = self._parse_ocr_with_inferred_columns(ocr_data)
+            entries = self._parse_ocr_with_inferred_columns(ocr_data, scan)
             if not entries:
                 entries = self._parse_ocr_data(ocr_data)
 
@@ -69,15 +563,16 @@ class TimetableParser:
         doc.extraction_timestamp = datetime.now().isoformat()
 
         # Post-process entries: try to assign missing times using OCR header time tokens
+        by_day = None
         try:
-            self._postprocess_entries(doc, ocr_data)
+            by_day = self._postprocess_entries(doc, ocr_data, scan)
         except Exception:
             # non-fatal
             pass
 
         # Normalize activities and fill in simple, known default blocks
         try:
-            self._normalize_and_fill_defaults(doc)
+            self._normalize_and_fill_defaults(doc, by_day)
         except Exception:
             # best-effort only
             pass
@@ -90,7 +585,12 @@ class TimetableParser:
 
         return doc
 
-    def _postprocess_entries(self, doc: TimetableDocument, ocr_data: List[Dict[str, any]]) -> None:
+    def _postprocess_entries(
+        self,
+        doc: TimetableDocument,
+        ocr_data: List[Dict[str, any]],
+        scan: Optional[_OCRScan] = None
+    ) -> Optional[Dict[Optional[Weekday], List[TimetableEntry]]]:
         """
         Post-process parsed entries to assign missing times where possible.
 
@@ -99,22 +599,17 @@ class TimetableParser:
         - Sort them left-to-right to form the column time slots
         - For each weekday, assign missing times to entries in reading order using these header slots
         This is a best-effort heuristic for cases where table structure wasn't detected.
+
+        Returns the rebuilt per-day entry lists (in doc.entries order) so the
+        next step doesn't have to regroup them, or None if nothing was rebuilt.
         """
         if not ocr_data or not doc.entries:
             return
 
         # Collect header-like time tokens (located near top of page)
-        header_candidates = []
-        for item in ocr_data:
-            txt = item.get('text', '')
-            if not txt or not isinstance(txt, str):
-                continue
-            if self._contains_time(txt):
-                # prefer items near the top (norm y small)
-                pos = item.get('position', (0.5, 0.5))
-                y = pos[1]
-                x = pos[0]
-                header_candidates.append((y, x, txt))
+        if scan is None:
+            scan = self._scan_ocr(ocr_data)
+        header_candidates = [(y, x, txt) for y, x, _, txt in scan.time_items]
 
         if not header_candidates:
             return
@@ -138,38 +633,31 @@ class TimetableParser:
         header_slots = [p[1] for p in parsed]
 
         # For each weekday, assign missing times in order using header_slots
-        from collections import defaultdict
         by_day = defaultdict(list)
         for entry in doc.entries:
             by_day[entry.weekday].append(entry)
 
-        for day, entries in by_day.items():
-            # Build an index over header slots
-            idx = 0
-            for entry in entries:
-                # Skip entries that look like metadata or are very short
-                text_l = (entry.activity or '').lower()
-                if any(k in text_l for k in ('class:', 'teacher', 'term', 'school', 'file')):
-                    continue
-                if len(text_l.strip()) < 3:
-                    continue
+        # (table parses usually time every entry, so skip the walk entirely then)
+        if any(entry.timeslot is None for entry in doc.entries):
+            for day, entries in by_day.items():
+                # Build an index over header slots
+                idx = 0
+                for entry in entries:
+                    if entry.timeslot is not None:
+                        continue
+                    # Skip entries that look like metadata or are very short
+                    text_l = (entry.activity or '').lower()
+                    if _METADATA_LABEL_RE.search(text_l) or 'file' in text_l:
+                        continue
+                    if len(text_l.strip()) < 3:
+                        continue
+
+                    entry.timeslot = header_slots[idx % len(header_slots)]
+                    idx += 1
 
-                if entry.timeslot is None:
-                    if header_slots:
-                        entry.timeslot = header_slots[idx % len(header_slots)]
-                        idx += 1
         # Further post-processing: ensure end_time exists and merge overlapping
         # activities per weekday. This is best-effort: we use other entries' start
         # times, header_slots and a +60 minute fallback when necessary.
-        from datetime import datetime, timedelta
-
-        def _time_to_minutes(t: time) -> int:
-            return t.hour * 60 + t.minute
-
-        def _minutes_to_time(m: int) -> time:
-            h = (m // 60) % 24
-            mm = m % 60
-            return time(h, mm)
 
         # Normalize times from raw_text where possible
         for day, entries in list(by_day.items()):
@@ -189,28 +677,30 @@ class TimetableParser:
             # sort by start_time minutes
             with_start.sort(key=lambda x: _time_to_minutes(x.timeslot.start_time))
 
+            # First header slot index per start minute. Rebuilt per day because
+            # entries may share header TimeSlot objects that an earlier day's
+            # merge has shifted.
+            header_index: Dict[int, int] = {}
+            for hs_i, hs in enumerate(header_slots):
+                if hs and hs.start_time:
+                    header_index.setdefault(_time_to_minutes(hs.start_time), hs_i)
+
             # assign missing end_time using next entry start, header_slots or +60min
             for i, e in enumerate(with_start):
                 ts = e.timeslot
                 if not ts.end_time and ts.start_time:
-                    # try next entry
+                    # every entry in with_start has a start_time, so the next one is it
                     end_assigned = False
-                    for j in range(i+1, len(with_start)):
-                        other = with_start[j]
-                        if other.timeslot and other.timeslot.start_time:
-                            e.timeslot.end_time = other.timeslot.start_time
-                            end_assigned = True
-                            break
+                    if i + 1 < len(with_start):
+                        e.timeslot.end_time = with_start[i + 1].timeslot.start_time
+                        end_assigned = True
 
                     if not end_assigned and header_slots:
-                        # try to match against header slots
-                        for hs_i, hs in enumerate(header_slots):
-                            if hs and hs.start_time and _time_to_minutes(hs.start_time) == _time_to_minutes(ts.start_time):
-                                # use next header start if exists
-                                if hs_i + 1 < len(header_slots) and header_slots[hs_i + 1].start_time:
-                                    e.timeslot.end_time = header_slots[hs_i + 1].start_time
-                                    end_assigned = True
-                                break
+                        # try to match against header slots; use next header start if exists
+                        hs_i = header_index.get(_time_to_minutes(ts.start_time))
+                        if hs_i is not None and hs_i + 1 < len(header_slots) and header_slots[hs_i + 1].start_time:
+                            e.timeslot.end_time = header_slots[hs_i + 1].start_time
+                            end_assigned = True
 
                     if not end_assigned:
                         # fallback +60 minutes
@@ -218,37 +708,37 @@ class TimetableParser:
                         e.timeslot.end_time = _minutes_to_time(st_min + 60)
 
             # after ensuring end_times, merge overlapping entries for the day
+            # (with_start is still in start order: only end times changed above)
             merged: List[TimetableEntry] = []
-            for e in sorted(with_start, key=lambda x: _time_to_minutes(x.timeslot.start_time)):
-                if not merged:
-                    merged.append(e)
-                    continue
-                cur = merged[-1]
-                # if either has None end_time we conservatively skip merging
-                if not cur.timeslot or not cur.timeslot.end_time or not e.timeslot or not e.timeslot.start_time:
+            # start/end minutes of merged[-1], kept in step with its timeslot;
+            # cur_end is None when it has no end_time
+            cur_start = cur_end = None
+            for e in with_start:
+                e_start = _time_to_minutes(e.timeslot.start_time)
+                e_end = _time_to_minutes(e.timeslot.end_time) if e.timeslot.end_time else None
+
+                # if the current block has no end_time we conservatively skip merging
+                if cur_end is None or e_start > cur_end:
                     merged.append(e)
+                    cur_start, cur_end = e_start, e_end
                     continue
 
-                cur_end = _time_to_minutes(cur.timeslot.end_time)
-                e_start = _time_to_minutes(e.timeslot.start_time)
-                e_end = _time_to_minutes(e.timeslot.end_time) if e.timeslot.end_time else e_start + 60
-
-                if e_start <= cur_end:
-                    # overlap -> merge
-                    new_start_min = min(_time_to_minutes(cur.timeslot.start_time), e_start)
-                    new_end_min = max(cur_end, e_end)
-                    # combine activity texts if different
-                    if cur.activity and e.activity and cur.activity.strip().lower() != e.activity.strip().lower():
-                        combined_activity = f"{cur.activity} / {e.activity}"
-                    else:
-                        combined_activity = cur.activity or e.activity
-
-                    cur.timeslot.start_time = _minutes_to_time(new_start_min)
-                    cur.timeslot.end_time = _minutes_to_time(new_end_min)
-                    cur.activity = combined_activity
-                    cur.confidence_score = max(cur.confidence_score, e.confidence_score)
+                # overlap -> merge
+                cur = merged[-1]
+                new_start_min = min(cur_start, e_start)
+                new_end_min = max(cur_end, e_start + 60 if e_end is None else e_end)
+                # combine activity texts if different
+                if cur.activity and e.activity and cur.activity.strip().lower() != e.activity.strip().lower():
+                    combined_activity = f"{cur.activity} / {e.activity}"
                 else:
-                    merged.append(e)
+                    combined_activity = cur.activity or e.activity
+
+                cur.timeslot.start_time = _minutes_to_time(new_start_min)
+                cur.timeslot.end_time = _minutes_to_time(new_end_min)
+                cur.activity = combined_activity
+                cur.confidence_score = max(cur.confidence_score, e.confidence_score)
+                # _minutes_to_time() wraps past midnight
+                cur_start, cur_end = new_start_min % 1440, new_end_min % 1440
 
             # replace day's entries in doc with merged ones + any entries without start_time
             no_start = [e for e in entries if not (e.timeslot and e.timeslot.start_time)]
@@ -259,19 +749,23 @@ class TimetableParser:
 
         # Rebuild doc.entries preserving order by weekday and within-day order
         new_entries: List[TimetableEntry] = []
-        # Try to preserve Monday..Sunday order if Weekday enum supports ordering via name
-        weekday_order = list(Weekday)
-        for wd in weekday_order:
+        # Preserve Monday..Sunday order
+        for wd in _WEEKDAY_LIST:
             if wd in by_day:
                 new_entries.extend(by_day[wd])
         # append any days not represented in Weekday enum iteration
         for day, lst in by_day.items():
-            if day not in weekday_order:
+            if day not in _WEEKDAY_ORDER:
                 new_entries.extend(lst)
 
         doc.entries = new_entries
+        return by_day
 
-    def _normalize_and_fill_defaults(self, doc: TimetableDocument) -> None:
+    def _normalize_and_fill_defaults(
+        self,
+        doc: TimetableDocument,
+        by_day: Optional[Dict[Optional[Weekday], List[TimetableEntry]]] = None
+    ) -> None:
         """Best-effort normalization and minimal default block insertion.
 
         Goals (lightweight, not over-engineered):
@@ -282,13 +776,14 @@ class TimetableParser:
             * Break 10:20–10:35
             * Lunch 12:00–13:00
             * Storytime 15:00–15:15
+
+        by_day, when given, must group doc.entries by weekday in document
+        order (as returned by _postprocess_entries()); it is reused instead of
+        being rebuilt.
         """
         if not doc.entries:
             return
 
-        from collections import defaultdict
-        from datetime import time as dtime
-
         # 1) Normalize activity text
         for e in doc.entries:
             if e.activity:
@@ -297,56 +792,36 @@ class TimetableParser:
                 # prefer the leading activity as the primary label while keeping
                 # the rest in notes when notes are empty.
                 if ' / ' in e.activity and not e.notes:
-                    parts = [p.strip() for p in e.activity.split(' / ') if p.strip()]
-                    if parts:
-                        e.notes = ' / '.join(parts[1:]) if len(parts) > 1 else None
-                        e.activity = parts[0]
+                    head, _, tail = e.activity.partition(' / ')
+                    head = head.strip()
+                    if head and ' / ' not in tail:
+                        # common two-part case
+                        e.notes = tail.strip() or None
+                        e.activity = head
+                    else:
+                        parts = [p.strip() for p in e.activity.split(' / ') if p.strip()]
+                        if parts:
+                            e.notes = ' / '.join(parts[1:]) if len(parts) > 1 else None
+                            e.activity = parts[0]
 
         # 2) Build per-day index and detect which days appear
-        by_day = defaultdict(list)
-        present_days = set()
-        for e in doc.entries:
-            if e.weekday:
-                present_days.add(e.weekday)
-                by_day[e.weekday].append(e)
+        if by_day is None:
+            by_day = defaultdict(list)
+            for e in doc.entries:
+                if e.weekday:
+                    by_day[e.weekday].append(e)
+        present_days = [wd for wd, day_entries in by_day.items() if wd and day_entries]
 
         if not present_days:
             return
 
-        def _minutes(t: dtime) -> int:
-            return t.hour * 60 + t.minute
-
-        def _overlaps(a_start: dtime, a_end: dtime, b_start: dtime, b_end: dtime) -> bool:
-            return _minutes(a_start) < _minutes(b_end) and _minutes(b_start) < _minutes(a_end)
-
-        # Canonical default blocks
-        defaults = [
-            ("Registration and Early Morning work", dtime(8, 35), dtime(8, 50)),
-            ("Break", dtime(10, 20), dtime(10, 35)),
-            ("Lunch", dtime(12, 0), dtime(13, 0)),
-            ("Storytime", dtime(15, 0), dtime(15, 15)),
-        ]
-
-        # Helper to check if block exists for a given day
-        def _has_block(day_entries: list[TimetableEntry], label: str, st: dtime, et: dtime) -> bool:
-            for e in day_entries:
-                if not e.timeslot or not e.timeslot.start_time or not e.timeslot.end_time:
-                    # try to match by name only if times missing; consider it present
-                    if e.activity and label.lower() in e.activity.lower():
-                        return True
-                    continue
-                if e.activity and label.lower() in e.activity.lower():
-                    if _overlaps(e.timeslot.start_time, e.timeslot.end_time, st, et):
-                        return True
-            return False
-
         # 3) Insert missing default blocks for days that appear
-        new_entries: list[TimetableEntry] = []
         for day in present_days:
-            day_entries = by_day.get(day, [])
-            for label, st, et in defaults:
-                if not _has_block(day_entries, label, st, et):
-                    new_entries.append(
+            day_entries = by_day[day]
+            day_index = _day_activity_index(day_entries)
+            for (label, st, et), key in zip(_DEFAULT_BLOCKS, _DEFAULT_BLOCK_KEYS):
+                if not _has_block(day_index, *key):
+                    day_entries.append(
                         TimetableEntry(
                             weekday=day,
                             timeslot=TimeSlot(start_time=st, end_time=et, raw_text=f"{label}"),
@@ -355,18 +830,16 @@ class TimetableParser:
                         )
                     )
 
-        # 4) Add the new defaults and sort entries within each day by start time where possible
-        doc.entries.extend(new_entries)
-
-        # Sort to improve readability/output order
-        def _sort_key(e: TimetableEntry):
-            if e.weekday and e.timeslot and e.timeslot.start_time:
-                return (list(Weekday).index(e.weekday), _minutes(e.timeslot.start_time))
-            if e.weekday:
-                return (list(Weekday).index(e.weekday), 10_000)
-            return (10_000, 10_000)
-
-        doc.entries.sort(key=_sort_key)
+        # 4) Emit days in Monday..Sunday order, each sorted by start time where
+        # possible; entries without a weekday keep their order at the end
+        sorted_entries: list[TimetableEntry] = []
+        for wd in _WEEKDAY_LIST:
+            day_entries = by_day.get(wd)
+            if day_entries:
+                day_entries.sort(key=_entry_start_key)
+                sorted_entries.extend(day_entries)
+        sorted_entries.extend(e for e in doc.entries if not e.weekday)
+        doc.entries = sorted_entries
 
     def _cleanup_anomalies(self, doc: TimetableDocument) -> None:
         """Remove or adjust entries that are clearly spurious.
@@ -379,15 +852,12 @@ class TimetableParser:
         if not doc.entries:
             return
 
-        def minutes(t: time) -> int:
-            return t.hour * 60 + t.minute
-
         cleaned: List[TimetableEntry] = []
         for e in doc.entries:
             keep = True
             if e.timeslot and e.timeslot.start_time:
-                st = minutes(e.timeslot.start_time)
-                et = minutes(e.timeslot.end_time) if e.timeslot.end_time else st + 60
+                st = _time_to_minutes(e.timeslot.start_time)
+                et = _time_to_minutes(e.timeslot.end_time) if e.timeslot.end_time else st + 60
 
                 if st < 7 * 60 + 30 or et > 18 * 60:
                     keep = False
@@ -401,7 +871,11 @@ class TimetableParser:
             # Detect merged multi-activity strings (3+ keywords)
             if keep and e.activity:
                 low = e.activity.lower()
-                hits = sum(1 for k in self.activity_keywords if k in low)
+                # Keywords overlap ('math' in 'maths'), so distinct hits are
+                # counted per keyword, but only once the text has any at all
+                hits = 0
+                if self._activity_re.search(low):
+                    hits = sum(1 for k in self.activity_keywords if k in low)
                 if hits >= 3:
                     keep = False
 
@@ -430,29 +904,26 @@ class TimetableParser:
         if not text_items:
             return
         
-        full_text = ' '.join(text_items).lower()
+        joined_text = ' '.join(text_items)
+        full_text = joined_text.lower()
         
         # Class pattern (e.g., "Class: 2EJ", "2EJ", "4M")
-        class_pattern = re.compile(r'class[:\s]+([a-z0-9]+)|^(\d[a-z]{1,3})\b', re.IGNORECASE)
-        class_match = class_pattern.search(' '.join(text_items))
+        class_match = _CLASS_RE.search(joined_text)
         if class_match:
             doc.class_name = class_match.group(1) or class_match.group(2)
         
         # Teacher pattern (e.g., "Teacher: Miss Joynes", "Miss Joynes", "Mr. Smith")
-        teacher_pattern = re.compile(r'teacher[:\s]+((?:miss|mrs|mr|ms)\.?\s+\w+)', re.IGNORECASE)
-        teacher_match = teacher_pattern.search(full_text)
+        teacher_match = _TEACHER_RE.search(full_text)
         if teacher_match:
             doc.teacher_name = teacher_match.group(1).title()
         
         # Term pattern (e.g., "Autumn 2 2024", "Spring 2 Week: 2")
-        term_pattern = re.compile(r'(autumn|spring|summer)\s*\d+\s*(?:week[:\s]+\d+)?\s*\d{4}', re.IGNORECASE)
-        term_match = term_pattern.search(full_text)
+        term_match = _TERM_RE.search(full_text)
         if term_match:
             doc.term = term_match.group(0).title()
         
         # School pattern
-        school_pattern = re.compile(r'([a-z\s]+(?:primary|secondary|school))', re.IGNORECASE)
-        school_match = school_pattern.search(' '.join(text_items))
+        school_match = _SCHOOL_HINT_RE.search(joined_text) and _SCHOOL_RE.search(joined_text)
         if school_match:
             doc.school_name = school_match.group(1).strip().title()
     
@@ -490,7 +961,11 @@ class TimetableParser:
         
         return entries
 
-    def _parse_ocr_with_inferred_columns(self, ocr_data: List[Dict[str, any]]) -> List[TimetableEntry]:
+    def _parse_ocr_with_inferred_columns(
+        self,
+        ocr_data: List[Dict[str, any]],
+        scan: Optional[_OCRScan] = None
+    ) -> List[TimetableEntry]:
         """
         Attempt to infer column time slots from header time tokens (top of page)
         and map OCR items into those columns. This helps handle tables where
@@ -502,11 +977,13 @@ class TimetableParser:
         if not ocr_data:
             return entries
 
-        # Infer image width from OCR bbox coordinates if available
-        img_w = self._compute_image_width(ocr_data)
+        if scan is None:
+            scan = self._scan_ocr(ocr_data)
+        # Image width inferred from OCR bbox coordinates if available
+        img_w = scan.image_width
 
         # Find header time tokens near top of page
-        header_slots = self._infer_header_slots_from_ocr(ocr_data, img_w)
+        header_slots = self._infer_header_slots_from_ocr(scan)
         if not header_slots or len(header_slots) < 2:
             # not enough header info to form columns
             return entries
@@ -532,6 +1009,19 @@ class TimetableParser:
             left = b
         # last column to image width
         col_ranges.append((left, img_w))
+        
+        # Ranges are contiguous, so when their edges are sorted the columns a
+        # box overlaps form one index range found by two binary searches
+        col_lefts = [l for l, _ in col_ranges]
+        col_rights = [r for _, r in col_ranges]
+        ranges_sorted = (
+            all(a <= b for a, b in zip(col_lefts, col_lefts[1:])) and
+            all(a <= b for a, b in zip(col_rights, col_rights[1:]))
+        )
+        reference_times = _ReferenceIndex.for_slots([s['slot'] for s in slots_sorted])
+        # header-derived (start, end) per (first_col, last_col) span; boxes
+        # in the same columns share it
+        span_times: Dict[Tuple[int, int], Tuple[Optional[time], Optional[time]]] = {}
 
         # Group OCR items by detected weekday (rows)
         rows = self._group_by_rows(ocr_data)
@@ -540,15 +1030,10 @@ class TimetableParser:
 
         for row in rows:
             # detect if this row contains a weekday
-            weekday = None
-            for item in row:
-                wd = Weekday.from_string(item.get('text', ''))
-                if wd:
-                    weekday = wd
-                    current_day = wd
-                    break
-
-            if not weekday:
+            weekday = _row_weekday(row)
+            if weekday:
+                current_day = weekday
+            else:
                 weekday = current_day
 
             if not weekday:
@@ -562,11 +1047,11 @@ class TimetableParser:
                     continue
 
                 # skip header-like metadata rows
-                if any(k in txt.lower() for k in ('class:', 'teacher', 'term', 'school')):
+                if _METADATA_LABEL_RE.search(txt.lower()):
                     continue
 
                 # if the cell explicitly contains a time range, prefer that
-                explicit_ts = self.parse_timeslot(txt, reference_times=[s['slot'] for s in slots_sorted])
+                explicit_ts = self.parse_timeslot(txt, reference_times=reference_times)
                 if explicit_ts and not self._is_activity(txt):
                     # if it is a pure time cell, we don't create an activity
                     continue
@@ -583,13 +1068,19 @@ class TimetableParser:
                     min_x = cx - 1
                     max_x = cx + 1
 
-                overlapping_cols = []
-                for ci, (l, r) in enumerate(col_ranges):
-                    # consider overlap if bbox intersects column range
-                    if max_x >= l and min_x <= r:
-                        overlapping_cols.append(ci)
+                # consider overlap if bbox intersects column range
+                if ranges_sorted:
+                    first_col = bisect_left(col_rights, min_x)
+                    last_col = bisect_right(col_lefts, max_x) - 1
+                else:
+                    overlapping_cols = [
+                        ci for ci, (l, r) in enumerate(col_ranges)
+                        if max_x >= l and min_x <= r
+                    ]
+                    first_col = overlapping_cols[0] if overlapping_cols else 1
+                    last_col = overlapping_cols[-1] if overlapping_cols else 0
 
-                if not overlapping_cols:
+                if first_col > last_col:
                     # couldn't map to any column; skip
                     continue
 
@@ -598,49 +1089,22 @@ class TimetableParser:
                 if explicit_ts:
                     final_ts = explicit_ts
                 else:
-                    first_col = overlapping_cols[0]
-                    last_col = overlapping_cols[-1]
-                    # start from header slot start
-                    start_slot = slots_sorted[first_col]['slot']
-                    # end time: if the last_col has a next header, use its start as end
-                    if last_col + 1 < len(slots_sorted):
-                        end_slot = slots_sorted[last_col + 1]['slot']
-                        # if that slot has a start_time, use it as end
-                        if end_slot and end_slot.start_time:
-                            final_ts = TimeSlot(start_time=start_slot.start_time, end_time=end_slot.start_time, raw_text=txt)
-                        else:
-                            # fallback: if header slots have end_time, use last's end_time or estimate 60 minutes
-                            if slots_sorted[last_col]['slot'] and slots_sorted[last_col]['slot'].end_time:
-                                final_ts = TimeSlot(start_time=start_slot.start_time, end_time=slots_sorted[last_col]['slot'].end_time, raw_text=txt)
-                            else:
-                                # estimate one hour slot
-                                sh = start_slot.start_time.hour
-                                sm = start_slot.start_time.minute
-                                est_end = (sh + 1) % 24
-                                final_ts = TimeSlot(start_time=start_slot.start_time, end_time=time(est_end, sm), raw_text=txt)
-                    else:
-                        # last column — try to use its own end_time or estimate
-                        last_header = slots_sorted[last_col]['slot']
-                        if last_header and last_header.end_time:
-                            final_ts = TimeSlot(start_time=start_slot.start_time, end_time=last_header.end_time, raw_text=txt)
-                        else:
-                            sh = start_slot.start_time.hour
-                            sm = start_slot.start_time.minute
-                            est_end = (sh + 1) % 24
-                            final_ts = TimeSlot(start_time=start_slot.start_time, end_time=time(est_end, sm), raw_text=txt)
+                    span = (first_col, last_col)
+                    span_ts = span_times.get(span)
+                    if span_ts is None:
+                        span_ts = span_times[span] = self._header_span_times(slots_sorted, first_col, last_col)
+                    final_ts = TimeSlot(start_time=span_ts[0], end_time=span_ts[1], raw_text=txt)
 
                 # If still no timeslot, fallback to parse one from text
                 if not explicit_ts and not final_ts:
-                    final_ts = self.parse_timeslot(txt, reference_times=[s['slot'] for s in slots_sorted])
+                    final_ts = self.parse_timeslot(txt, reference_times=reference_times)
 
                 # Normalize timeslot: ensure end_time > start_time, else estimate +1 hour
                 if final_ts and final_ts.start_time and final_ts.end_time:
-                    sh_m = final_ts.start_time.hour * 60 + final_ts.start_time.minute
-                    eh_m = final_ts.end_time.hour * 60 + final_ts.end_time.minute
-                    if eh_m <= sh_m:
+                    sh_m = _time_to_minutes(final_ts.start_time)
+                    if _time_to_minutes(final_ts.end_time) <= sh_m:
                         # assume spanning next slot — set end = start + 60 minutes
-                        new_end_hour = (final_ts.start_time.hour + 1) % 24
-                        final_ts.end_time = time(new_end_hour, final_ts.start_time.minute)
+                        final_ts.end_time = _minutes_to_time(sh_m + 60)
 
                 # If text appears to be an activity, create entry
                 if self._is_activity(txt):
@@ -655,24 +1119,49 @@ class TimetableParser:
 
         return entries
 
-    def _infer_header_slots_from_ocr(self, ocr_data: List[Dict[str, any]], img_w: float) -> List[Dict[str, any]]:
+    @staticmethod
+    def _header_span_times(
+        slots_sorted: List[Dict[str, any]],
+        first_col: int,
+        last_col: int
+    ) -> Tuple[Optional[time], Optional[time]]:
+        """
+        Start and end time of a box spanning header columns first_col..last_col.
+        
+        The start comes from the first column's header. The end is the next
+        column's start, else the last column's end time, else one hour later.
+        """
+        # start from header slot start
+        start_slot = slots_sorted[first_col]['slot']
+        # end time: if the last_col has a next header, use its start as end
+        if last_col + 1 < len(slots_sorted):
+            end_slot = slots_sorted[last_col + 1]['slot']
+            # if that slot has a start_time, use it as end
+            if end_slot and end_slot.start_time:
+                return start_slot.start_time, end_slot.start_time
+            # fallback: if header slots have end_time, use last's end_time or estimate 60 minutes
+            if slots_sorted[last_col]['slot'] and slots_sorted[last_col]['slot'].end_time:
+                return start_slot.start_time, slots_sorted[last_col]['slot'].end_time
+        else:
+            # last column — try to use its own end_time or estimate
+            last_header = slots_sorted[last_col]['slot']
+            if last_header and last_header.end_time:
+                return start_slot.start_time, last_header.end_time
+        # estimate one hour slot
+        return start_slot.start_time, _minutes_to_time(_time_to_minutes(start_slot.start_time) + 60)
+    
+    def _infer_header_slots_from_ocr(self, scan: _OCRScan) -> List[Dict[str, any]]:
         """
         Find header time tokens near the top of the page and return a list of
         dicts: { 'x': normalized_x, 'x_px': center_x_pixels, 'slot': TimeSlot }
         """
         candidates = []
-        for item in ocr_data:
-            txt = item.get('text', '')
-            if not txt or not isinstance(txt, str):
-                continue
-            # location near the top
-            y = item.get('position', (0.5, 0.5))[1]
-            if y > 0.35:
-                continue
-            if self._contains_time(txt):
+        # location near the top
+        for y, x, center_px, txt in scan.time_items:
+            if y <= 0.35:
                 ts = self.parse_timeslot(txt)
                 if ts:
-                    candidates.append((item.get('center', (0, 0))[0], item.get('position', (0, 0))[0], ts))
+                    candidates.append((center_px, x, ts))
 
         if not candidates:
             return []
@@ -692,10 +1181,23 @@ class TimetableParser:
 
         return header_slots
 
-    def _compute_image_width(self, ocr_data: List[Dict[str, any]]) -> float:
-        """Estimate image width from OCR bbox coordinates (pixels)."""
+    @staticmethod
+    def _scan_ocr(ocr_data: List[Dict[str, any]]) -> _OCRScan:
+        """
+        Walk the OCR items once, collecting top-half time tokens and the image width.
+        
+        Items without a position count as y=0.5. The width is estimated from
+        bbox coordinates (pixels), falling back to box centers.
+        """
+        time_items = []
         max_x = 0.0
         for it in ocr_data:
+            txt = it.get('text', '')
+            if txt and isinstance(txt, str):
+                pos = it.get('position', (0.5, 0.5))
+                if pos[1] < 0.50 and _text_contains_time(txt):
+                    time_items.append((pos[1], pos[0], it.get('center', (0, 0))[0], txt))
+            
             bbox = it.get('bbox')
             if bbox and isinstance(bbox, list):
                 try:
@@ -707,8 +1209,8 @@ class TimetableParser:
                 cx = it.get('center', (0, 0))[0]
                 if cx:
                     max_x = max(max_x, cx)
-
-        return max_x if max_x > 0 else 1.0
+        
+        return _OCRScan(time_items, max_x if max_x > 0 else 1.0)
     
     def _identify_table_structure(self, content: List[List[str]]) -> Dict[str, any]:
         """
@@ -722,16 +1224,15 @@ class TimetableParser:
         """
         structure = {'type': 'unknown', 'day_index': -1, 'time_indices': []}
         
-        # Check first column for weekdays
+        # Check first column for weekdays, stopping once three are found
+        # (Weekday.from_string() is case-insensitive, so cells aren't lowercased)
         if content and len(content) > 1:
-            first_col = []
+            weekday_count = 0
             for row in content[1:]:
-                if row and len(row) > 0:
-                    first_col.append(row[0].lower() if isinstance(row[0], str) else '')
-                else:
-                    first_col.append('')
-            
-            weekday_count = sum(1 for cell in first_col if self._contains_weekday(cell))
+                if row and row[0] and isinstance(row[0], str) and _text_contains_weekday(row[0]):
+                    weekday_count += 1
+                    if weekday_count >= 3:
+                        break
             
             if weekday_count >= 3:
                 structure['type'] = 'weekday_rows'
@@ -741,21 +1242,17 @@ class TimetableParser:
                 if content[0]:
                     structure['time_indices'] = [
                         i for i, cell in enumerate(content[0]) 
-                        if cell and isinstance(cell, str) and self._contains_time(cell)
+                        if cell and isinstance(cell, str) and _text_contains_time(cell)
                     ]
                 return structure
         
         # Check first row for weekdays
         if content and len(content) > 0 and content[0]:
-            first_row = [cell.lower() if isinstance(cell, str) else '' for cell in content[0]]
-            weekday_count = sum(1 for cell in first_row if self._contains_weekday(cell))
+            is_day = [bool(cell) and isinstance(cell, str) and _text_contains_weekday(cell) for cell in content[0]]
             
-            if weekday_count >= 3:
+            if sum(is_day) >= 3:
                 structure['type'] = 'weekday_columns'
-                structure['day_indices'] = [
-                    i for i, cell in enumerate(first_row) 
-                    if self._contains_weekday(cell)
-                ]
+                structure['day_indices'] = [i for i, flag in enumerate(is_day) if flag]
                 return structure
         
         return structure
@@ -776,6 +1273,9 @@ class TimetableParser:
             List of TimetableEntry objects
         """
         entries = []
+        # bound once for the per-cell loops below
+        parse_timeslot = self.parse_timeslot
+        add_entry = entries.append
         day_col = structure['day_index']
         
         # Get time slots from header row
@@ -784,101 +1284,95 @@ class TimetableParser:
         if content and content[0]:
             for i, cell in enumerate(content[0]):
                 if i > day_col:  # Skip day column
-                    timeslot = self.parse_timeslot(cell)
+                    timeslot = parse_timeslot(cell)
                     time_slots.append((i, timeslot))
                     if timeslot:
                         header_times.append(timeslot)
+        header_refs = _ReferenceIndex.for_slots(header_times)
         
         # Parse each row (each row is a day)
+        header_width = len(content[0]) if content and content[0] else 0
         for row in content[1:]:
             if not row or len(row) <= day_col:
                 continue
             
             # Extract weekday
             day_text = row[day_col].strip()
-            weekday = Weekday.from_string(day_text)
+            weekday = _text_weekday(day_text)
             
             if not weekday:
                 continue
             
+            cells = _clean_row(row)
+            # pad short rows so every header column has a (possibly empty) cell
+            if len(cells) < header_width:
+                cells.extend([''] * (header_width - len(cells)))
+            # comparison keys for colspan detection, lower-cased once per cell
+            cell_keys = [c.lower().strip() for c in cells]
+            
             # Extract activities for each time slot. If adjacent columns contain
             # the same activity text, treat as a span (colspan) and create a
             # single entry with an end_time that covers the spanned columns.
             ci = 0
             while ci < len(time_slots):
                 col_idx, timeslot = time_slots[ci]
-                if col_idx >= len(row):
-                    ci += 1
-                    continue
-
-                activity_text = row[col_idx].strip()
-                if not activity_text or activity_text.lower() in ['', 'nan', 'none']:
+                activity_text = cells[col_idx]
+                if not activity_text:
                     ci += 1
                     continue
 
                 # If the cell explicitly contains a time range, prefer that
-                explicit_ts = self.parse_timeslot(activity_text, reference_times=header_times)
+                explicit_ts = parse_timeslot(activity_text, reference_times=header_refs)
 
                 # Check for identical consecutive cells to detect colspan
-                span_last_col = col_idx
                 span_count = 1
+                activity_key = cell_keys[col_idx]
                 for look in range(ci + 1, len(time_slots)):
                     next_col_idx, _ = time_slots[look]
-                    if next_col_idx < len(row):
-                        next_text = row[next_col_idx].strip()
-                        # consider equal if normalized texts match
-                        if next_text and next_text.lower().strip() == activity_text.lower().strip():
-                            span_last_col = next_col_idx
-                            span_count += 1
-                            continue
+                    # consider equal if normalized texts match
+                    if cells[next_col_idx] and cell_keys[next_col_idx] == activity_key:
+                        span_count += 1
+                        continue
                     break
 
                 # Build final timeslot: explicit > spanned header range > single header
                 final_ts = explicit_ts
-                if not final_ts:
-                    start_slot = timeslot
+                if not final_ts and timeslot:
                     # end time: if there is a header after the last spanned column, use its start
                     # otherwise use the end_time of the last header or estimate +1 hour
-                    try:
-                        last_index = None
-                        # find index of span_last_col in time_slots to get following header
-                        for idx_map, (tci, _) in enumerate(time_slots):
-                            if tci == span_last_col:
-                                last_index = idx_map
-                                break
-
-                        if last_index is not None and (last_index + 1) < len(time_slots):
-                            next_header_ts = time_slots[last_index + 1][1]
-                            if next_header_ts and next_header_ts.start_time:
-                                final_ts = TimeSlot(start_time=start_slot.start_time, end_time=next_header_ts.start_time, raw_text=activity_text)
-                            else:
-                                # fall back to last header's end_time
-                                last_header = time_slots[last_index][1]
-                                if last_header and last_header.end_time:
-                                    final_ts = TimeSlot(start_time=start_slot.start_time, end_time=last_header.end_time, raw_text=activity_text)
-                                else:
-                                    # estimate +1 hour
-                                    est_end = (start_slot.start_time.hour + 1) % 24
-                                    final_ts = TimeSlot(start_time=start_slot.start_time, end_time=time(est_end, start_slot.start_time.minute), raw_text=activity_text)
+                    # the span covers time_slots[ci:ci + span_count], so the
+                    # following header is right after its last entry
+                    last_index = ci + span_count - 1
+
+                    end_time = None
+                    if (last_index + 1) < len(time_slots):
+                        next_header_ts = time_slots[last_index + 1][1]
+                        if next_header_ts and next_header_ts.start_time:
+                            end_time = next_header_ts.start_time
                         else:
-                            # no following header; use last header end_time or estimate
-                            last_header = timeslot
+                            # fall back to last header's end_time
+                            last_header = time_slots[last_index][1]
                             if last_header and last_header.end_time:
-                                final_ts = TimeSlot(start_time=start_slot.start_time, end_time=last_header.end_time, raw_text=activity_text)
-                            else:
-                                est_end = (start_slot.start_time.hour + 1) % 24
-                                final_ts = TimeSlot(start_time=start_slot.start_time, end_time=time(est_end, start_slot.start_time.minute), raw_text=activity_text)
-                    except Exception:
-                        # fallback to the original timeslot
+                                end_time = last_header.end_time
+                    else:
+                        # no following header; use last header end_time or estimate
+                        if timeslot.end_time:
+                            end_time = timeslot.end_time
+                    if end_time is None and timeslot.start_time:
+                        # estimate +1 hour
+                        end_time = _minutes_to_time(_time_to_minutes(timeslot.start_time) + 60)
+                    if end_time is not None:
+                        final_ts = TimeSlot(start_time=timeslot.start_time, end_time=end_time, raw_text=activity_text)
+                    else:
+                        # no start to estimate from: keep the original timeslot
                         final_ts = timeslot
 
-                entry = TimetableEntry(
+                add_entry(TimetableEntry(
                     weekday=weekday,
                     timeslot=final_ts,
                     activity=activity_text,
                     confidence_score=0.85  # Table-based extraction is typically reliable
-                )
-                entries.append(entry)
+                ))
 
                 # advance by span_count
                 ci += span_count
@@ -911,45 +1405,44 @@ class TimetableParser:
         for idx in day_indices:
             if idx < len(content[0]):
                 day_text = content[0][idx]
-                weekday = Weekday.from_string(day_text)
+                weekday = _text_weekday(day_text)
                 if weekday:
                     weekdays.append((idx, weekday))
         
         # Parse each row (each row is a time slot or activity)
         # Build a list of reference times from the first column if possible
+        parse_timeslot = self.parse_timeslot
         reference_times: List[TimeSlot] = []
         for r in range(1, len(content)):
             if content[r] and len(content[r]) > 0:
-                ts = self.parse_timeslot(content[r][0])
+                ts = parse_timeslot(content[r][0])
                 if ts:
                     reference_times.append(ts)
+        ref_index = _ReferenceIndex.for_slots(reference_times)
 
         for row_idx in range(1, len(content)):
             row = content[row_idx]
 
-            # Try to extract time from first column
+            # Try to extract time from first column. Without references this
+            # is the parse that already failed while collecting them above.
             timeslot = None
-            if row:
-                timeslot = self.parse_timeslot(row[0], reference_times=reference_times)
-
-            # Extract activities for each day
-            for col_idx, weekday in weekdays:
-                if col_idx < len(row):
-                    activity_text = row[col_idx].strip()
-
-                    if not activity_text or activity_text.lower() in ['', 'nan', 'none']:
-                        continue
-
-                    explicit_ts = self.parse_timeslot(activity_text, reference_times=reference_times)
-                    final_ts = explicit_ts or timeslot
-
-                    entry = TimetableEntry(
-                        weekday=weekday,
-                        timeslot=final_ts,
-                        activity=activity_text,
-                        confidence_score=0.85
-                    )
-                    entries.append(entry)
+            if row and reference_times:
+                timeslot = parse_timeslot(row[0], reference_times=ref_index)
+
+            # Extract activities for each day; a time inside the cell
+            # overrides the row's time
+            cells = _clean_row(row)
+            n_cells = len(cells)
+            entries.extend([
+                TimetableEntry(
+                    weekday=weekday,
+                    timeslot=parse_timeslot(cells[col_idx], reference_times=ref_index) or timeslot,
+                    activity=cells[col_idx],
+                    confidence_score=0.85
+                )
+                for col_idx, weekday in weekdays
+                if col_idx < n_cells and cells[col_idx]
+            ])
         
         return entries
     
@@ -964,6 +1457,8 @@ class TimetableParser:
             List of TimetableEntry objects
         """
         entries = []
+        parse_timeslot = self.parse_timeslot
+        activity_re = self._activity_re
         
         for row in content:
             weekday = None
@@ -971,14 +1466,21 @@ class TimetableParser:
             activity = None
             
             for cell in row:
-                if not weekday and self._contains_weekday(cell):
-                    weekday = Weekday.from_string(cell)
+                if not cell or not isinstance(cell, str):
+                    continue
+                flags = _classify_cell(cell, activity_re)
                 
-                if not timeslot and self._contains_time(cell):
-                    timeslot = self.parse_timeslot(cell)
+                if not weekday and flags & _CELL_WEEKDAY:
+                    weekday = _text_weekday(cell)
                 
-                if not activity and self._is_activity(cell):
+                if not timeslot and flags & _CELL_TIME:
+                    timeslot = parse_timeslot(cell)
+                
+                if not activity and flags & _CELL_ACTIVITY:
                     activity = cell.strip()
+                
+                if weekday and timeslot and activity:
+                    break
             
             if weekday and activity:
                 entry = TimetableEntry(
@@ -1012,15 +1514,10 @@ class TimetableParser:
             row_text = ' '.join([item['text'] for item in row])
             
             # Check for weekday
-            weekday = None
-            for item in row:
-                wd = Weekday.from_string(item['text'])
-                if wd:
-                    weekday = wd
-                    current_day = wd
-                    break
-            
-            if not weekday:
+            weekday = _row_weekday(row)
+            if weekday:
+                current_day = weekday
+            else:
                 weekday = current_day
             
             # Extract timeslot
@@ -1029,9 +1526,11 @@ class TimetableParser:
             # Extract activity
             activity_parts = []
             for item in row:
-                if (not self._contains_weekday(item['text']) and 
-                    not self._is_time_only(item['text'])):
-                    activity_parts.append(item['text'])
+                text = item['text']
+                if not text or not isinstance(text, str):
+                    activity_parts.append(text)
+                elif not _classify_cell(text, self._activity_re) & (_CELL_WEEKDAY | _CELL_TIME_ONLY):
+                    activity_parts.append(text)
             
             activity = ' '.join(activity_parts).strip()
             
@@ -1054,315 +1553,50 @@ class TimetableParser:
         
         Args:
             text: Text containing time information
+            reference_times: Known slot times used to resolve am/pm, either
+                a TimeSlot list or a prebuilt _ReferenceIndex
         
         Returns:
             TimeSlot object or None
         """
         if not text or not isinstance(text, str):
             return None
-        
-        text = text.strip()
-        
-        if not text:
+        # Every time form the parser accepts has a digit; most cells are plain activities
+        if not _DIGIT_RE.search(text):
             return None
         
-        # Pre-normalize text to reduce OCR noise and support a wider range of separators
-        # - normalize various dash characters to '-' so ranges are caught
-        # - convert dots between hour/min to ':' (OCR commonly uses '.' for ':')
-        # - collapse multiple spaces
-        norm = text.replace('\u2013', '-').replace('\u2014', '-').replace('\u2012', '-')
-        norm = re.sub(r'[–—−]', '-', norm)
-        # replace lone dot used as separator (e.g., '9.30') with ':' but avoid replacing decimal dots in numbers
-        norm = re.sub(r'(?<=\d)\.(?=\d{2}\b)', ':', norm)
-        # common OCR mistakes: letter O for zero in minute positions
-        # Python's `re` requires fixed-width lookbehind. The original
-        # pattern used a variable-width lookbehind `(?<=:\s?)` which fails
-        # for some Python versions. Replace using a captured prefix and a
-        # lambda replacement to avoid lookbehind altogether.
-        norm = re.sub(r'(:\s?)[Oo](?=\b)', lambda m: m.group(1) + '0', norm, flags=re.IGNORECASE)
-        norm = re.sub(r'\s+', ' ', norm).strip()
-
-        # If the text doesn't look like a time at all (no separators / am/pm / range), bail early
-        looks_like_time = bool(
-            re.search(r'\b\d{1,2}[:.]\d{2}\b', norm, flags=re.IGNORECASE) or
-            re.search(r'\b\d{1,2}\s*(am|pm)\b', norm, flags=re.IGNORECASE) or
-            re.search(r'\b\d{1,2}(?::\d{2})?\s*(?:-|–|—|to)\s*\d{1,2}(?::\d{2})?\b', norm, flags=re.IGNORECASE)
-        )
-
-        if not looks_like_time and not reference_times:
-            # Avoid interpreting arbitrary numbers (e.g., years "2024", class "2EJ") as times
+        if not isinstance(reference_times, _ReferenceIndex):
+            reference_times = _ReferenceIndex.for_slots(reference_times)
+        parsed = _parse_timeslot_cached(text, reference_times.starts)
+        if parsed is None:
             return None
-
-        # First attempt: look for explicit ranges like '1:15 - 2:15', '9.30 to 10:15', '1 - 2pm'
-        range_re = re.compile(r"(\d{1,2}(?::|\.)?\d{0,2})\s*(?:-|–|—|to)\s*(\d{1,2}(?::|\.)?\d{0,2})(?:\s*(am|pm|AM|PM))?")
-        mrange = range_re.search(norm)
-        if mrange:
-            left = mrange.group(1)
-            right = mrange.group(2)
-            trailing_ampm = mrange.group(3)
-
-            # normalize separators to ':' for consistent parsing
-            left = left.replace('.', ':')
-            right = right.replace('.', ':')
-
-            def _split_time_token(tok: str):
-                if ':' in tok:
-                    h, mm = tok.split(':', 1)
-                    mm = mm[:2] if mm else '00'
-                else:
-                    h = tok
-                    mm = '00'
-                return int(re.sub(r'\D', '', h)), int(re.sub(r'\D', '', mm))
-
-            try:
-                lh, lm = _split_time_token(left)
-                rh, rm = _split_time_token(right)
-
-                # prepare am/pm propagation
-                left_ampm = None
-                right_ampm = trailing_ampm
-                # If explicit AM/PM present inside tokens (rare), try to extract
-                inner_left = re.search(r'(am|pm|AM|PM)$', left)
-                inner_right = re.search(r'(am|pm|AM|PM)$', right)
-                if inner_left:
-                    left_ampm = inner_left.group(1)
-                if inner_right:
-                    right_ampm = inner_right.group(1)
-
-                # propagate if only one side has am/pm
-                if left_ampm and not right_ampm:
-                    right_ampm = left_ampm
-                if right_ampm and not left_ampm:
-                    left_ampm = right_ampm
-
-                def _map_hour_local(h: int, ampm: Optional[str]) -> int:
-                    if ampm:
-                        return _map_hour(h, ampm)
-                    return h
-
-                sh = _map_hour_local(lh, left_ampm)
-                eh = _map_hour_local(rh, right_ampm)
-
-                # If still ambiguous (no am/pm), and reference_times exist, choose mapping (h or h+12)
-                if not left_ampm and reference_times:
-                    # pick mapping (h or h+12) that minimizes minute difference to any ref start
-                    def _best_map(h0):
-                        cand1 = h0 % 24
-                        cand2 = (h0 + 12) % 24
-                        best_cand = cand1
-                        best_diff = None
-                        for ref in reference_times:
-                            if not ref or not ref.start_time:
-                                continue
-                            for cand in (cand1, cand2):
-                                diff = abs((cand * 60 + lm) - (ref.start_time.hour * 60 + ref.start_time.minute))
-                                if best_diff is None or diff < best_diff:
-                                    best_diff = diff
-                                    best_cand = cand
-                        return best_cand
-
-                    sh = _best_map(lh)
-
-                if not right_ampm and reference_times:
-                    def _best_map_r(h0):
-                        cand1 = h0 % 24
-                        cand2 = (h0 + 12) % 24
-                        best_cand = cand1
-                        best_diff = None
-                        for ref in reference_times:
-                            if not ref or not ref.start_time:
-                                continue
-                            for cand in (cand1, cand2):
-                                diff = abs((cand * 60 + rm) - (ref.start_time.hour * 60 + ref.start_time.minute))
-                                if best_diff is None or diff < best_diff:
-                                    best_diff = diff
-                                    best_cand = cand
-                        return best_cand
-                    eh = _best_map_r(rh)
-
-                start_time = time(int(sh), int(lm))
-                end_time = time(int(eh), int(rm))
-                # ensure end > start, otherwise if end <= start assume +1 hour
-                if (end_time.hour * 60 + end_time.minute) <= (start_time.hour * 60 + start_time.minute):
-                    end_time = time((start_time.hour + 1) % 24, start_time.minute)
-
-                return TimeSlot(start_time=start_time, end_time=end_time, raw_text=text.strip())
-            except Exception:
-                # fall through to token-based parsing
-                pass
-
-        # Find all time-like tokens in the (normalized) text
-        matches = list(self._time_re.finditer(norm))
-
-        def _map_hour(h: int, ampm: Optional[str]) -> int:
-            # Map 12-hour hour and am/pm to 24-hour
-            if ampm:
-                am = ampm.lower() == 'am'
-                pm = ampm.lower() == 'pm'
-                if am and h == 12:
-                    return 0
-                if pm and h < 12:
-                    return h + 12
-                return h % 24
-            # No am/pm provided — we'll infer later
-            return h
-
-        times = []
-        for m in matches:
-            h = int(m.group(1))
-            mm = int(m.group(2)) if m.group(2) else 0
-            ampm = m.group(3)
-            times.append({'hour': h, 'minute': mm, 'ampm': ampm})
-
-        if len(times) >= 2:
-            # Treat first two as a range
-            s = times[0]
-            e = times[1]
-
-            # If either has am/pm, propagate to the other if missing
-            if s['ampm'] and not e['ampm']:
-                e['ampm'] = s['ampm']
-            if e['ampm'] and not s['ampm']:
-                s['ampm'] = e['ampm']
-
-            # If still missing am/pm and reference times provided, try to infer
-            def _resolve(t, refs):
-                if t['ampm']:
-                    return _map_hour(t['hour'], t['ampm']), t['minute']
-                # Try to infer using reference_times (compare nearest minute)
-                if refs:
-                    best_choice = None
-                    best_diff = None
-                    for add12 in (0, 12):
-                        cand = (t['hour'] % 12) + add12
-                        cand_minutes = cand * 60 + t['minute']
-                        for ref in refs:
-                            if ref and ref.start_time:
-                                ref_minutes = ref.start_time.hour * 60 + ref.start_time.minute
-                                diff = abs(cand_minutes - ref_minutes)
-                                if best_diff is None or diff < best_diff:
-                                    best_diff = diff
-                                    best_choice = (cand, t['minute'])
-                    if best_choice:
-                        return best_choice
-                # Fallback heuristic: morning hours 7-11 -> AM, else PM (12->12)
-                if 7 <= t['hour'] <= 11:
-                    return t['hour'] % 24, t['minute']
-                if t['hour'] == 12:
-                    return 12, t['minute']
-                return (t['hour'] + 12) % 24, t['minute']
-
-            try:
-                sh, sm = _resolve(s, reference_times)
-                eh, em = _resolve(e, reference_times)
-                start_time = time(int(sh), int(sm))
-                end_time = time(int(eh), int(em))
-                return TimeSlot(start_time=start_time, end_time=end_time, raw_text=text.strip())
-            except Exception:
-                pass
-
-        if len(times) == 1:
-            t = times[0]
-            # resolve hour
-            if t['ampm']:
-                h24 = _map_hour(t['hour'], t['ampm'])
-            else:
-                # infer from reference_times or heuristics
-                if reference_times:
-                    # pick closest reference hour
-                    best = None
-                    best_diff = None
-                    for ref in reference_times:
-                        if ref and ref.start_time:
-                            diff = abs(t['hour'] - (ref.start_time.hour % 12))
-                            if best_diff is None or diff < best_diff:
-                                best_diff = diff
-                                best = ref.start_time.hour
-                    if best is not None:
-                        # choose mapping closest to best (either h or h+12)
-                        if abs(t['hour'] - (best % 12)) <= abs((t['hour'] + 12) - best):
-                            h24 = t['hour'] % 24
-                        else:
-                            h24 = (t['hour'] + 12) % 24
-                    else:
-                        # fallback heuristic
-                        if 7 <= t['hour'] <= 11:
-                            h24 = t['hour'] % 24
-                        elif t['hour'] == 12:
-                            h24 = 12
-                        else:
-                            h24 = (t['hour'] + 12) % 24
-                else:
-                    if 7 <= t['hour'] <= 11:
-                        h24 = t['hour'] % 24
-                    elif t['hour'] == 12:
-                        h24 = 12
-                    else:
-                        h24 = (t['hour'] + 12) % 24
-
-            try:
-                start_time = time(int(h24), int(t['minute']))
-                return TimeSlot(start_time=start_time, raw_text=text.strip())
-            except Exception:
-                pass
-        
-        # Return raw text if parseable times not found but text looks time-related
-        if self._contains_time(text):
-            return TimeSlot(raw_text=text.strip())
-        
-        return None
+        start_time, end_time, raw_text = parsed
+        return TimeSlot(start_time=start_time, end_time=end_time, raw_text=raw_text)
     
     def _contains_weekday(self, text: str) -> bool:
         """Check if text contains a weekday."""
         if not text or not isinstance(text, str):
             return False
-        return Weekday.from_string(text) is not None
+        return _text_contains_weekday(text)
     
     def _contains_time(self, text: str) -> bool:
         """Check if text contains time information."""
         if not text or not isinstance(text, str):
             return False
-        t = text.lower()
-        # Strict patterns to avoid matching plain numbers like years or class codes
-        #  - explicit HH:MM or H.MM
-        if re.search(r'\b\d{1,2}[:.]\d{2}\b', t):
-            return True
-        #  - H am/pm
-        if re.search(r'\b\d{1,2}\s*(am|pm)\b', t):
-            return True
-        #  - ranges like 9-10, 9:30-10, 9.30 to 10.15
-        if re.search(r'\b\d{1,2}(?::\d{2})?\s*(?:-|–|—|to)\s*\d{1,2}(?::\d{2})?\b', t):
-            return True
-        return False
+        return _text_contains_time(text)
     
     def _is_time_only(self, text: str) -> bool:
         """Check if text is only time (no other content)."""
         if not text or not isinstance(text, str):
             return False
-        cleaned = re.sub(r'[\d:.\-–—\s]+(?:am|pm)?', '', text, flags=re.IGNORECASE)
-        return len(cleaned.strip()) < 2
+        return _text_is_time_only(text)
     
     def _is_activity(self, text: str) -> bool:
         """Check if text appears to be an activity."""
         if not text or not isinstance(text, str):
             return False
-        
-        text_lower = text.lower().strip()
-        
-        if len(text_lower) < 2:
-            return False
-        
-        # Check against known activity keywords
-        if any(keyword in text_lower for keyword in self.activity_keywords):
-            return True
-        
-        # If it's not a weekday or time, and has reasonable length, consider it an activity
-        if (not self._contains_weekday(text) and 
-            not self._is_time_only(text) and 
-            len(text_lower) >= 3):
-            return True
-        
-        return False
+        # Lowercased/stripped once per distinct cell text, not once per call
+        return _text_is_activity(text, self._activity_re)
     
     def _group_by_rows(
         self, 
@@ -1373,23 +1607,18 @@ class TimetableParser:
         if not ocr_data:
             return []
         
-        rows = []
-        current_row = [ocr_data[0]]
-        current_y = ocr_data[0]['position'][1]
+        if is_columnar(ocr_data):
+            xs, ys = ocr_data.positions[:, 0], ocr_data.positions[:, 1]
+        else:
+            ys = np.fromiter((item['position'][1] for item in ocr_data), dtype=np.float64, count=len(ocr_data))
+            xs = np.fromiter((item['position'][0] for item in ocr_data), dtype=np.float64, count=len(ocr_data))
         
-        for item in ocr_data[1:]:
-            y = item['position'][1]
-            
-            if abs(y - current_y) <= threshold:
-                current_row.append(item)
-            else:
-                current_row.sort(key=lambda x: x['position'][0])
-                rows.append(current_row)
-                current_row = [item]
-                current_y = y
+        bounds = find_row_starts(ys, threshold).tolist() + [len(ocr_data)]
         
-        if current_row:
-            current_row.sort(key=lambda x: x['position'][0])
-            rows.append(current_row)
+        # Order each row left-to-right with one native argsort per row
+        rows = []
+        for start, end in zip(bounds, bounds[1:]):
+            order = (start + np.argsort(xs[start:end], kind='stable')).tolist()
+            rows.append([ocr_data[i] for i in order])
         
         return rows
@@ -1,21 +1,102 @@
 """Document preprocessing for various file formats."""
 
+import hashlib
 import io
+import os
 import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Union
+from typing import Deque, Iterator, List, Optional, Tuple, Union
 import numpy as np
 from PIL import Image
 import cv2
 
+from .utils import prefetch
+
+try:
+    import pymupdf
+except ImportError:  # optional speedup, see the 'fast' extra
+    pymupdf = None
+
+try:
+    from blake3 import blake3
+except ImportError:  # optional speedup, see the 'fast' extra
+    blake3 = None
+
+
+def _cuda_available() -> bool:
+    """True if OpenCV was built with CUDA and can see at least one device."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+def _file_digest(file_path: Path) -> str:
+    """
+    Hex content hash of a file, used as its page cache key.
+    
+    Uses BLAKE3 when installed, SHA-256 otherwise.
+    """
+    if blake3 is not None:
+        return blake3(max_threads=blake3.AUTO).update_mmap(file_path).hexdigest()
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+# Bump whenever _preprocess_image() output changes, to invalidate page caches
+_PREPROCESS_VERSION = 3
+
+# A PDF page is treated as a scan (and denoised) once embedded images cover
+# this fraction of it; smaller images are logos or clip art on a rendered page
+_SCANNED_IMAGE_COVERAGE = 0.25
+
+
+def _page_is_scanned(page) -> bool:
+    """
+    True if a PyMuPDF page is mostly raster content (a scan or photo).
+    
+    Text and vector graphics render without noise, so only pages whose
+    embedded images cover a large part of them need denoising.
+    """
+    page_area = abs(page.rect)
+    if not page_area:
+        return True
+    image_area = sum(abs(pymupdf.Rect(info['bbox']) & page.rect) for info in page.get_image_info())
+    return image_area >= _SCANNED_IMAGE_COVERAGE * page_area
+
+
+# Upper bound on PDF pages preprocessed concurrently (each is ~25MB at 300 DPI)
+_MAX_PAGE_WORKERS = 4
+
 
 class DocumentPreprocessor:
     """Handles conversion and preprocessing of various document formats."""
     
-    def __init__(self):
-        """Initialize the document preprocessor."""
+    def __init__(self, use_gpu: bool = False, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the document preprocessor.
+        
+        Args:
+            use_gpu: Run denoising and contrast enhancement with OpenCV's CUDA
+                module (falls back to the CPU if OpenCV was built without it
+                or no device is present)
+            cache_dir: Optional directory where the preprocessed pages of each
+                input are saved, keyed by a hash of the file's bytes, and reused
+                when the same file is processed again
+        """
         self.supported_image_formats = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif'}
         self.supported_doc_formats = {'.pdf', '.docx'}
+        # CLAHE objects and the LAB scratch image are reused between pages,
+        # so each preprocessing thread gets its own (see _clahe())
+        self._local = threading.local()
+        self.use_cuda = use_gpu and _cuda_available()
+        if use_gpu and not self.use_cuda:
+            print("  → OpenCV CUDA support not available, preprocessing on CPU")
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
     
     def process(self, file_path: Union[str, Path]) -> List[np.ndarray]:
         """
@@ -27,6 +108,25 @@ class DocumentPreprocessor:
         Returns:
             List of images as numpy arrays (one per page/image)
         
+        Raises:
+            ValueError: If file format is not supported
+        """
+        return list(self.iter_pages(file_path))
+    
+    def iter_pages(self, file_path: Union[str, Path]) -> Iterator[np.ndarray]:
+        """
+        Lazily yield preprocessed page images, one per page/image.
+        
+        Pages are converted and preprocessed only as they are consumed, so a
+        caller can start working on the first page while later ones are
+        still being prepared (see utils.prefetch()).
+        
+        Args:
+            file_path: Path to the document file
+        
+        Yields:
+            Images as numpy arrays (BGR format)
+        
         Raises:
             ValueError: If file format is not supported
         """
@@ -34,13 +134,63 @@ class DocumentPreprocessor:
         extension = file_path.suffix.lower()
         
         if extension in self.supported_image_formats:
-            return self._process_image(file_path)
+            pages = partial(self._process_image, file_path)
         elif extension == '.pdf':
-            return self._process_pdf(file_path)
+            pages = partial(self._process_pdf, file_path)
         elif extension == '.docx':
-            return self._process_docx(file_path)
+            pages = partial(self._process_docx, file_path)
         else:
             raise ValueError(f"Unsupported file format: {extension}")
+        
+        if self.cache_dir is None:
+            yield from pages()
+        else:
+            yield from self._cached_pages(file_path, pages)
+    
+    def _cached_pages(self, file_path: Path, pages) -> Iterator[np.ndarray]:
+        """
+        Serve a file's pages from the page cache, or produce and store them.
+        
+        Pages are saved only once all of them have been produced, so an
+        interrupted run never leaves a partial entry behind.
+        
+        Args:
+            file_path: Path to the document file
+            pages: Callable returning an iterable of the preprocessed pages
+        
+        Yields:
+            Images as numpy arrays (BGR format)
+        """
+        mode = 'cuda' if self.use_cuda else 'cpu'
+        # The PDF renderer decides which pages are denoised (see _rasterize_pdf())
+        renderer = 'pymupdf' if pymupdf is not None else 'pdf2image'
+        cache_file = self.cache_dir / f"{_file_digest(file_path)}_v{_PREPROCESS_VERSION}_{mode}_{renderer}.npz"
+        
+        if cache_file.exists():
+            try:
+                with np.load(cache_file) as data:
+                    cached = [data[f'arr_{i}'] for i in range(len(data.files))]
+            except Exception as e:
+                print(f"  → Ignoring unreadable page cache {cache_file}: {e}")
+            else:
+                print(f"  → Loaded {len(cached)} preprocessed page(s) from cache")
+                yield from cached
+                return
+        
+        produced = []
+        for page in pages():
+            produced.append(page)
+            yield page
+        
+        tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # uncompressed, so a hit is a straight read of the uint8 pages
+            with open(tmp_file, 'wb') as f:
+                np.savez(f, *produced)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            print(f"  → Could not save page cache {cache_file}: {e}")
     
     def _process_image(self, file_path: Path) -> List[np.ndarray]:
         """
@@ -70,45 +220,112 @@ class DocumentPreprocessor:
         except Exception as e:
             raise ValueError(f"Error processing image {file_path}: {e}")
     
-    def _process_pdf(self, file_path: Path) -> List[np.ndarray]:
+    def _process_pdf(self, file_path: Path) -> Iterator[np.ndarray]:
         """
         Convert PDF to images.
         
         Args:
             file_path: Path to PDF file
         
-        Returns:
-            List of images (one per page)
+        Yields:
+            Preprocessed images (one per page)
         """
+        # Rendering runs in a background thread (utils.prefetch()) while
+        # earlier pages are preprocessed on a small pool; OpenCV releases
+        # the GIL, so the stages overlap. Pages come back in order and at
+        # most ``workers`` are in flight, which bounds memory at 300 DPI.
+        workers = min(_MAX_PAGE_WORKERS, os.cpu_count() or 1)
+        pages = prefetch(self._rasterize_pdf(file_path), depth=workers)
+        pending: Deque[Future] = deque()
+        
+        def _result(future: Future) -> np.ndarray:
+            try:
+                return future.result()
+            except Exception as e:
+                raise ValueError(f"Error processing PDF {file_path}: {e}")
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='preprocess') as pool:
+            try:
+                for img_bgr, denoise in pages:
+                    pending.append(pool.submit(self._preprocess_image, img_bgr, denoise))
+                    if len(pending) >= workers:
+                        yield _result(pending.popleft())
+                while pending:
+                    yield _result(pending.popleft())
+            finally:
+                # consumer stopped early or a page failed: drop queued work
+                # and stop the renderer
+                for future in pending:
+                    future.cancel()
+                pages.close()
+    
+    def _rasterize_pdf(self, file_path: Path) -> Iterator[Tuple[np.ndarray, bool]]:
+        """
+        Render PDF pages at 300 DPI (good OCR quality), one page at a time.
+        
+        PyMuPDF renders in-process when it is installed; otherwise pages are
+        rasterized by Poppler through pdf2image.
+        
+        Args:
+            file_path: Path to PDF file
+        
+        Yields:
+            ``(image, denoise)`` pairs: the page as a numpy array (BGR format),
+            and whether it needs denoising. Only PyMuPDF can tell vector pages
+            from scans, so pages rendered by pdf2image are always denoised.
+        """
+        if pymupdf is not None:
+            try:
+                doc = pymupdf.open(str(file_path))
+            except Exception as e:
+                raise ValueError(f"Error processing PDF {file_path}: {e}")
+            with doc:
+                for page in doc:
+                    try:
+                        pix = page.get_pixmap(dpi=300, colorspace=pymupdf.csRGB, alpha=False)
+                        img_array = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+                        # cvtColor copies, so the page buffer is not kept alive
+                        img_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+                        denoise = _page_is_scanned(page)
+                    except Exception as e:
+                        raise ValueError(f"Error processing PDF {file_path}: {e}")
+                    yield img_bgr, denoise
+            return
+        
         try:
             from pdf2image import convert_from_path
-            
-            # Convert PDF to images (300 DPI for good OCR quality)
-            images = convert_from_path(
-                str(file_path),
-                dpi=300,
-                fmt='RGB'
-            )
-            
-            # Convert PIL images to numpy arrays (BGR format for PaddleOCR) and preprocess
-            processed_images = []
-            for img in images:
-                # Convert PIL Image (RGB) to numpy array then to BGR for OpenCV/PaddleOCR
-                img_array = np.array(img)
-                img_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-                processed = self._preprocess_image(img_bgr)
-                processed_images.append(processed)
-            
-            return processed_images
         except ImportError:
             raise ImportError(
                 "pdf2image is required for PDF processing. "
                 "Install with: pip install pdf2image"
             )
-        except Exception as e:
-            raise ValueError(f"Error processing PDF {file_path}: {e}")
+        
+        # Pages are rendered by several pdftoppm workers into a scratch folder
+        # (thread_count only takes effect with output_folder) and read back
+        # one at a time, so they don't all sit in memory at once
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            try:
+                images = convert_from_path(
+                    str(file_path),
+                    dpi=300,
+                    fmt='RGB',
+                    thread_count=max(1, os.cpu_count() or 1),
+                    output_folder=tmp_dir
+                )
+            except Exception as e:
+                raise ValueError(f"Error processing PDF {file_path}: {e}")
+            
+            for img in images:
+                try:
+                    # Convert PIL Image (RGB) to numpy array then to BGR for OpenCV/PaddleOCR
+                    img_array = np.array(img)
+                    img.close()
+                    img_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+                except Exception as e:
+                    raise ValueError(f"Error processing PDF {file_path}: {e}")
+                yield img_bgr, True
     
-    def _process_docx(self, file_path: Path) -> List[np.ndarray]:
+    def _process_docx(self, file_path: Path) -> Iterator[np.ndarray]:
         """
         Convert DOCX to images.
         
@@ -118,60 +335,118 @@ class DocumentPreprocessor:
         Args:
             file_path: Path to DOCX file
         
-        Returns:
-            List of images
+        Yields:
+            Preprocessed images (one per page)
         """
         try:
             import docx
             from docx2pdf import convert
-            
-            # Create temporary PDF file
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
-                tmp_pdf_path = Path(tmp.name)
-            
-            try:
-                # Convert DOCX to PDF
-                convert(str(file_path), str(tmp_pdf_path))
-                
-                # Process the PDF
-                images = self._process_pdf(tmp_pdf_path)
-                
-                return images
-            finally:
-                # Clean up temporary file
-                if tmp_pdf_path.exists():
-                    tmp_pdf_path.unlink()
-        
         except ImportError:
             raise ImportError(
                 "docx2pdf is required for DOCX processing. "
                 "Install with: pip install docx2pdf"
             )
-        except Exception as e:
-            raise ValueError(f"Error processing DOCX {file_path}: {e}")
+        
+        # Create temporary PDF file
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+            tmp_pdf_path = Path(tmp.name)
+        
+        try:
+            # Convert DOCX to PDF
+            try:
+                convert(str(file_path), str(tmp_pdf_path))
+            except Exception as e:
+                raise ValueError(f"Error processing DOCX {file_path}: {e}")
+            
+            # Process the PDF
+            yield from self._process_pdf(tmp_pdf_path)
+        finally:
+            # Clean up temporary file once all pages have been consumed
+            if tmp_pdf_path.exists():
+                tmp_pdf_path.unlink()
     
-    def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
+    def _preprocess_image(self, image: np.ndarray, denoise: bool = True) -> np.ndarray:
         """
         Apply preprocessing to improve OCR accuracy.
         
+        Oversized inputs are first scaled down with resize_for_ocr(), so
+        denoising and contrast enhancement never run on more pixels than
+        OCR will use.
+        
         Args:
             image: Input image as numpy array (BGR format from OpenCV)
+            denoise: Run non-local means denoising; False for pages rendered
+                from text and vector graphics, which have no noise to remove
+        
+        Returns:
+            Preprocessed image (BGR format, longest side at most 3000px)
+        """
+        image = self.resize_for_ocr(image)
+        if self.use_cuda:
+            return self._preprocess_image_cuda(image, denoise)
+        
+        # Work in LAB: OCR only needs the lightness channel cleaned up, so
+        # denoise L alone instead of running non-local means on all three
+        # channels (what fastNlMeansDenoisingColored does). The LAB image
+        # lives in a per-thread buffer reused across pages of the same size;
+        # only L is pulled out, and a/b are never copied.
+        lab = self._lab_buffer(image.shape)
+        cv2.cvtColor(image, cv2.COLOR_BGR2LAB, dst=lab)
+        l = cv2.extractChannel(lab, 0)
+        # NLM dominates the cost, so it is skipped for rendered vector pages
+        if denoise:
+            l = cv2.fastNlMeansDenoising(l, None, 10, 7, 21)
+        
+        # Enhance contrast using CLAHE on the lightness channel
+        l = self._clahe().apply(l)
+        cv2.insertChannel(l, lab, 0)
+        
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+    
+    def _preprocess_image_cuda(self, image: np.ndarray, denoise: bool = True) -> np.ndarray:
+        """
+        GPU version of _preprocess_image() using OpenCV's CUDA module.
+        
+        The CUDA non-local means kernel is not bit-identical to the CPU one,
+        so results can differ slightly from the CPU path.
+        
+        Args:
+            image: Input image as numpy array (BGR format)
+            denoise: Run non-local means denoising (see _preprocess_image())
         
         Returns:
             Preprocessed image (BGR format)
         """
-        # Denoise (works with BGR format)
-        denoised = cv2.fastNlMeansDenoisingColored(image, None, 10, 10, 7, 21)
+        local = self._local
+        gpu = getattr(local, 'gpu_image', None)
+        if gpu is None:
+            # upload() reuses the device buffer while the page size is unchanged
+            gpu = local.gpu_image = cv2.cuda_GpuMat()
+            local.gpu_clahe = cv2.cuda.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        gpu.upload(image)
         
-        # Enhance contrast using CLAHE on LAB color space
-        lab = cv2.cvtColor(denoised, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        l = clahe.apply(l)
-        enhanced = cv2.merge([l, a, b])
-        enhanced = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
+        lab = cv2.cuda.cvtColor(gpu, cv2.COLOR_BGR2LAB)
+        l, a, b = cv2.cuda.split(lab)
+        if denoise:
+            l = cv2.cuda.fastNlMeansDenoising(l, 10, search_window=21, block_size=7)
+        l = local.gpu_clahe.apply(l, cv2.cuda_Stream.Null())
+        enhanced = cv2.cuda.cvtColor(cv2.cuda.merge([l, a, b]), cv2.COLOR_LAB2BGR)
         
-        return enhanced
+        return enhanced.download()
+    
+    def _lab_buffer(self, shape: tuple) -> np.ndarray:
+        """The calling thread's LAB scratch image, reallocated when the page size changes."""
+        buf = getattr(self._local, 'lab', None)
+        if buf is None or buf.shape != shape:
+            buf = self._local.lab = np.empty(shape, dtype=np.uint8)
+        return buf
+    
+    def _clahe(self) -> "cv2.CLAHE":
+        """The calling thread's CLAHE instance, created on first use."""
+        clahe = getattr(self._local, 'clahe', None)
+        if clahe is None:
+            clahe = self._local.clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        return clahe
     
     @staticmethod
     def resize_for_ocr(image: np.ndarray, max_dimension: int = 3000) -> np.ndarray:
@@ -191,6 +466,8 @@ class DocumentPreprocessor:
             scale = max_dimension / max(h, w)
             new_w = int(w * scale)
             new_h = int(h * scale)
-            return cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
+            # always a downscale here; area averaging anti-aliases it and is
+            # much cheaper than Lanczos (as in OCRExtractor's own resize)
+            return cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
         
         return image
@@ -1,5 +1,8 @@
 """Table detection and extraction using img2table."""
 
+import re
+import threading
+import weakref
 from typing import List, Dict, Optional, Tuple
 import numpy as np
 from PIL import Image
@@ -7,6 +10,16 @@ from img2table.document import Image as Img2TableImage
 from img2table.ocr import PaddleOCR as Img2TableOCR
 
 
+# Day names and their abbreviations as whole words (a bare substring test
+# matched any header containing "m" or "f")
+_DAY_RE = re.compile(
+    r'\b(?:monday|tuesday|wednesday|thursday|friday|mon|tue|wed|thu|fri|m|tu|w|th|f)\b',
+    re.IGNORECASE
+)
+# Clock times ("9:00", "10.45") and am/pm markers
+_TIME_RE = re.compile(r'\b\d{1,2}[:.]\d{2}\b|\b\d{0,2}\s*[ap]m\b', re.IGNORECASE)
+
+
 class TableDetector:
     """Detects and extracts tables from images using img2table."""
     
@@ -23,6 +36,13 @@ class TableDetector:
         except TypeError:
             # Fallback if use_gpu is not supported in this version
             self.ocr = Img2TableOCR(lang='en')
+        
+        # img2table's OCR backend is not re-entrant; serialize extraction so
+        # detect_tables() can be called from worker threads
+        self._lock = threading.Lock()
+        # (weakref to the last image passed to detect_tables(), its raw
+        # img2table tables), reused by detect_table_structure()
+        self._last_tables: Optional[Tuple[weakref.ref, list]] = None
     
     def detect_tables(self, image: np.ndarray) -> List[Dict[str, any]]:
         """
@@ -58,12 +78,14 @@ class TableDetector:
             doc = Img2TableImage(tmp_path)
             
             # Extract tables
-            tables = doc.extract_tables(
-                ocr=self.ocr,
-                implicit_rows=True,  # Detect implicit row separators
-                borderless_tables=True,  # Detect tables without borders
-                min_confidence=50  # Minimum confidence for table detection
-            )
+            with self._lock:
+                tables = doc.extract_tables(
+                    ocr=self.ocr,
+                    implicit_rows=True,  # Detect implicit row separators
+                    borderless_tables=True,  # Detect tables without borders
+                    min_confidence=50  # Minimum confidence for table detection
+                )
+                self._last_tables = (weakref.ref(image), tables or [])
             
             if not tables:
                 return []
@@ -167,16 +189,14 @@ class TableDetector:
             if df is None or df.empty:
                 return []
             
-            # Convert to list of lists
-            # Include headers
-            content = [df.columns.tolist()]
-            content.extend(df.values.tolist())
+            # Convert to list of string rows, headers first, in one pass:
+            # None becomes '' and everything else its stripped str() (NaN
+            # stays 'nan', which the parser treats as a placeholder)
+            def _clean(row) -> List[str]:
+                return ['' if cell is None else str(cell).strip() for cell in row]
             
-            # Clean up None values and convert to strings
-            cleaned_content = []
-            for row in content:
-                cleaned_row = [str(cell).strip() if cell is not None else '' for cell in row]
-                cleaned_content.append(cleaned_row)
+            cleaned_content = [_clean(df.columns)]
+            cleaned_content.extend(_clean(row) for row in df.itertuples(index=False, name=None))
             
             return cleaned_content
         
@@ -191,6 +211,10 @@ class TableDetector:
         """
         Analyze table structure (rows, columns, cells).
         
+        Reuses the tables found by the last detect_tables() call when it was
+        given the same image, instead of running extraction (OCR included)
+        a second time.
+        
         Args:
             image: Input image
         
@@ -201,12 +225,10 @@ class TableDetector:
                 - cells: List of cell information
         """
         try:
-            doc = Img2TableImage(image)
-            tables = doc.extract_tables(
-                ocr=self.ocr,
-                implicit_rows=True,
-                borderless_tables=True
-            )
+            tables = self._tables_for(image)
+            if tables is None:
+                self.detect_tables(image)
+                tables = self._tables_for(image)
             
             if not tables:
                 return None
@@ -231,6 +253,14 @@ class TableDetector:
             print(f"Error analyzing table structure: {e}")
             return None
     
+    def _tables_for(self, image) -> Optional[list]:
+        """Raw tables cached by detect_tables() for this image, or None."""
+        with self._lock:
+            last = self._last_tables
+        if last is not None and last[0]() is image:
+            return last[1]
+        return None
+    
     @staticmethod
     def is_timetable_like(table_content: List[List[str]]) -> bool:
         """
@@ -246,30 +276,14 @@ class TableDetector:
             return False
         
         # Check for day names in first column or first row
-        day_keywords = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 
-                       'mon', 'tue', 'wed', 'thu', 'fri', 'm', 'tu', 'w', 'th', 'f']
-        
-        # Check first column
-        first_col = [row[0].lower() for row in table_content if row]
-        if any(any(day in cell for day in day_keywords) for cell in first_col):
+        if any(row and _DAY_RE.search(row[0]) for row in table_content):
             return True
-        
-        # Check first row
-        if table_content[0]:
-            first_row = [cell.lower() for cell in table_content[0]]
-            if any(any(day in cell for day in day_keywords) for cell in first_row):
-                return True
-        
-        # Check for time patterns
-        time_keywords = ['am', 'pm', ':', '-']
-        content_str = ' '.join([' '.join(row) for row in table_content]).lower()
-        time_indicators = sum(1 for kw in time_keywords if kw in content_str)
-        
-        # If multiple time indicators present, likely a timetable
-        if time_indicators >= 3:
+        if any(_DAY_RE.search(cell) for cell in table_content[0]):
             return True
         
-        return False
+        # If several times are present, likely a timetable
+        content_str = ' '.join([' '.join(row) for row in table_content])
+        return len(_TIME_RE.findall(content_str)) >= 3
     
     def extract_cells_by_position(
         self, 
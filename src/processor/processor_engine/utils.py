@@ -1,10 +1,69 @@
 """Validation and utility functions for timetable processing."""
 
+import os
+import queue
 import re
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List
+from typing import Iterable, Iterator, Optional, List, TypeVar, Union
+import numpy as np
 from .models import TimetableDocument, TimetableEntry
 
+try:
+    from numba import njit
+except ImportError:  # optional speedup, see the 'fast' extra
+    njit = None
+
+
+T = TypeVar('T')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_SLASH_RE = re.compile(r'\s*[/\n]\s*')
+
+_SUPPORTED_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.pdf', '.docx', '.bmp', '.tiff', '.tif'})
+
+# Common activity-name substitutions, applied in order by
+# normalize_activity_name(): (lower-cased key, case-insensitive pattern,
+# replacement). A substitution runs if its key occurs in the original name.
+_ACTIVITY_REPLACEMENTS = tuple(
+    (old, re.compile(old, re.IGNORECASE), new)
+    for old, new in {
+        # subjects and common abbreviations
+        'math': 'Maths',
+        'maths con': 'Maths Con',
+        'mathss': 'Maths',
+        'pe': 'PE',
+        'phys ed': 'PE',
+        'physical education': 'PE',
+        'comp': 'Computing',
+        'computing': 'Computing',
+        'computinguting': 'Computing',
+        're': 'RE',
+        'religious education': 'RE',
+        'pshe': 'PSHE',
+        'phse': 'PSHE',
+        'rwi': 'RWI',
+        # blocks
+        'story time': 'Storytime',
+        'storytime': 'Storytime',
+        'registration & early morning work': 'Registration and Early Morning work',
+        'registration and early morning work': 'Registration and Early Morning work',
+        'break': 'Break',
+        'lunch': 'Lunch',
+        # common OCR typos
+        'engli sh': 'English',
+        'engli\nsh': 'English',
+        'liibary': 'Library',
+        'libray': 'Library',
+        'comprehens ion': 'Comprehension',
+        'hens ion': 'hension',
+        'compre hension': 'Comprehension',
+        'comprehens\nion': 'Comprehension',
+        'assembly\n': 'Assembly ',
+    }.items()
+)
+
 
 class ValidationError(Exception):
     """Custom exception for validation errors."""
@@ -62,23 +121,25 @@ def validate_document(document: TimetableDocument) -> List[str]:
         warnings.append("No timetable entries were extracted")
         return warnings
     
-    # Check for entries without weekday
-    missing_weekday = sum(1 for e in document.entries if not e.weekday)
+    # Count entries without weekday, without timeslot, with low confidence
+    # and with suspiciously short activities in a single pass
+    missing_weekday = missing_timeslot = low_confidence = short_activities = 0
+    for e in document.entries:
+        if not e.weekday:
+            missing_weekday += 1
+        if not e.timeslot:
+            missing_timeslot += 1
+        if e.confidence_score < 0.5:
+            low_confidence += 1
+        if len(e.activity.strip()) < 2:
+            short_activities += 1
+    
     if missing_weekday > 0:
         warnings.append(f"{missing_weekday} entries missing weekday information")
-    
-    # Check for entries without timeslot
-    missing_timeslot = sum(1 for e in document.entries if not e.timeslot)
     if missing_timeslot > 0:
         warnings.append(f"{missing_timeslot} entries missing timeslot information")
-    
-    # Check for entries with low confidence
-    low_confidence = sum(1 for e in document.entries if e.confidence_score < 0.5)
     if low_confidence > 0:
         warnings.append(f"{low_confidence} entries have low confidence (< 50%)")
-    
-    # Check for suspiciously short activities
-    short_activities = sum(1 for e in document.entries if len(e.activity.strip()) < 2)
     if short_activities > 0:
         warnings.append(f"{short_activities} entries have very short activity text")
     
@@ -105,7 +166,7 @@ def sanitize_text(text: str) -> str:
         return ""
     
     # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WHITESPACE_RE.sub(' ', text)
     
     # Remove special characters that might cause issues
     text = text.replace('\x00', '')
@@ -116,10 +177,13 @@ def sanitize_text(text: str) -> str:
     return text
 
 
+@lru_cache(maxsize=2048)
 def normalize_activity_name(activity: str) -> str:
     """
     Normalize activity names for consistency.
     
+    Results are memoized: the same activity names repeat across days.
+    
     Args:
         activity: Activity name to normalize
     
@@ -128,50 +192,14 @@ def normalize_activity_name(activity: str) -> str:
     """
     activity = sanitize_text(activity)
     
-    # Common substitutions
-    replacements = {
-        # subjects and common abbreviations
-        'math': 'Maths',
-        'maths con': 'Maths Con',
-        'mathss': 'Maths',
-        'pe': 'PE',
-        'phys ed': 'PE',
-        'physical education': 'PE',
-        'comp': 'Computing',
-        'computing': 'Computing',
-        'computinguting': 'Computing',
-        're': 'RE',
-        'religious education': 'RE',
-        'pshe': 'PSHE',
-        'phse': 'PSHE',
-        'rwi': 'RWI',
-        # blocks
-        'story time': 'Storytime',
-        'storytime': 'Storytime',
-        'registration & early morning work': 'Registration and Early Morning work',
-        'registration and early morning work': 'Registration and Early Morning work',
-        'break': 'Break',
-        'lunch': 'Lunch',
-        # common OCR typos
-        'engli sh': 'English',
-        'engli\nsh': 'English',
-        'liibary': 'Library',
-        'libray': 'Library',
-        'comprehens ion': 'Comprehension',
-        'hens ion': 'hension',
-        'compre hension': 'Comprehension',
-        'comprehens\nion': 'Comprehension',
-        'assembly\n': 'Assembly ',
-    }
-    
     activity_lower = activity.lower()
-    for old, new in replacements.items():
+    for old, pattern, new in _ACTIVITY_REPLACEMENTS:
         if old in activity_lower:
-            activity = re.sub(old, new, activity, flags=re.IGNORECASE)
+            activity = pattern.sub(new, activity)
 
     # Trim repeated whitespace and newlines/slashes spacing
-    activity = re.sub(r'\s*[/\n]\s*', ' / ', activity)
-    activity = re.sub(r'\s+', ' ', activity).strip()
+    activity = _SLASH_RE.sub(' / ', activity)
+    activity = _WHITESPACE_RE.sub(' ', activity).strip()
     
     return activity.strip()
 
@@ -189,22 +217,24 @@ def merge_duplicate_entries(entries: List[TimetableEntry]) -> List[TimetableEntr
     if not entries:
         return []
     
-    unique_entries = []
-    seen = set()
+    # first entry per key, in input order (dicts keep insertion order)
+    unique: dict = {}
     
     for entry in entries:
-        # Create a key for deduplication
-        key = (
-            entry.weekday.value if entry.weekday else None,
-            str(entry.timeslot) if entry.timeslot else None,
-            entry.activity.lower().strip()
-        )
-        
-        if key not in seen:
-            seen.add(key)
-            unique_entries.append(entry)
+        # Create a key for deduplication. Weekday members hash directly, and
+        # a timeslot is compared by its times when it has both (what its
+        # "HH:MM-HH:MM" str() shows) or else by its raw text
+        ts = entry.timeslot
+        if ts is None:
+            ts_key = None
+        elif ts.start_time and ts.end_time:
+            ts_key = (ts.start_time, ts.end_time)
+        else:
+            ts_key = ts.raw_text
+        key = (entry.weekday, ts_key, entry.activity.lower().strip())
+        unique.setdefault(key, entry)
     
-    return unique_entries
+    return list(unique.values())
 
 
 def format_confidence_report(document: TimetableDocument) -> str:
@@ -220,18 +250,23 @@ def format_confidence_report(document: TimetableDocument) -> str:
     if not document.entries:
         return "No entries to analyze"
     
-    scores = [e.confidence_score for e in document.entries if e.confidence_score > 0]
+    # Collected once into an array; the statistics are numpy reductions.
+    # float64 keeps the 0.5/0.8 band edges exact for scores like 0.8.
+    scores = np.fromiter((e.confidence_score for e in document.entries), dtype=np.float64, count=len(document.entries))
+    scores = scores[scores > 0]
     
-    if not scores:
+    if not scores.size:
         return "No confidence scores available"
     
-    avg_score = sum(scores) / len(scores)
-    min_score = min(scores)
-    max_score = max(scores)
+    # Python's sum() rather than scores.mean(): numpy's pairwise summation
+    # can move the printed average by one in the last digit
+    avg_score = sum(scores.tolist()) / scores.size
+    min_score = float(scores.min())
+    max_score = float(scores.max())
     
-    high_confidence = sum(1 for s in scores if s >= 0.8)
-    medium_confidence = sum(1 for s in scores if 0.5 <= s < 0.8)
-    low_confidence = sum(1 for s in scores if s < 0.5)
+    high_confidence = int(np.count_nonzero(scores >= 0.8))
+    low_confidence = int(np.count_nonzero(scores < 0.5))
+    medium_confidence = scores.size - high_confidence - low_confidence
     
     report = f"""
 Confidence Report:
@@ -272,19 +307,121 @@ def estimate_processing_time(file_path: Path) -> str:
         return "Unknown"
 
 
-def is_supported_file(file_path: str) -> bool:
+def is_supported_file(file_path: Union[str, Path]) -> bool:
     """
     Quick check if file is supported.
     
+    Only the extension is looked at (no Path object is built), so this is
+    cheap enough to call for every file in a directory scan.
+    
     Args:
         file_path: Path to check
     
     Returns:
         True if file extension is supported
     """
-    supported = {'.png', '.jpg', '.jpeg', '.pdf', '.docx', '.bmp', '.tiff', '.tif'}
     try:
-        path = Path(file_path)
-        return path.suffix.lower() in supported
+        return os.path.splitext(file_path)[1].lower() in _SUPPORTED_EXTENSIONS
     except Exception:
         return False
+
+
+def prefetch(items: Iterable[T], depth: int = 2) -> Iterator[T]:
+    """
+    Iterate over items while a background thread produces the next ones.
+    
+    Useful for overlapping page conversion/preprocessing with OCR: up to
+    ``depth`` items are prepared ahead of the consumer. Exceptions raised
+    by the producer are re-raised in the consuming thread.
+    
+    Args:
+        items: Iterable to consume in the background
+        depth: Maximum number of items buffered ahead of the consumer
+    
+    Yields:
+        Items in their original order
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, depth))
+    done = object()
+    errors: List[BaseException] = []
+    stop = threading.Event()
+    
+    def _produce() -> None:
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                buffer.put(item)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            buffer.put(done)
+    
+    producer = threading.Thread(target=_produce, name='prefetch', daemon=True)
+    producer.start()
+    
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                if errors:
+                    raise errors[0]
+                return
+            yield item
+    finally:
+        # Unblock the producer if the consumer stops early
+        stop.set()
+        while producer.is_alive():
+            try:
+                buffer.get_nowait()
+            except queue.Empty:
+                producer.join(timeout=0.1)
+
+
+def _row_starts_numpy(ys: np.ndarray, threshold: float) -> np.ndarray:
+    starts = []
+    start = 0
+    n = len(ys)
+    while start < n:
+        starts.append(start)
+        far = np.flatnonzero(np.abs(ys[start + 1:] - ys[start]) > threshold)
+        start = start + 1 + int(far[0]) if far.size else n
+    return np.asarray(starts, dtype=np.int64)
+
+
+if njit is not None:
+    # Eager signature: compiled (or loaded from the on-disk cache) at import
+    # rather than on the first page. No fastmath, so results match NumPy.
+    @njit('int64[:](float64[:], float64)', cache=True)
+    def _row_starts_jit(ys: np.ndarray, threshold: float) -> np.ndarray:
+        starts = np.empty(ys.shape[0], dtype=np.int64)
+        count = 0
+        row_y = 0.0
+        for i in range(ys.shape[0]):
+            if count == 0 or abs(ys[i] - row_y) > threshold:
+                starts[count] = i
+                count += 1
+                row_y = ys[i]
+        return starts[:count]
+
+    _row_starts = _row_starts_jit
+else:
+    _row_starts = _row_starts_numpy
+
+
+def find_row_starts(ys: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Return the index where each row of vertically sorted elements starts.
+    
+    A row runs until the first element further than threshold from the
+    row's first element. Shared by OCRExtractor.group_text_by_rows() and
+    the parser's row grouping.
+    
+    Args:
+        ys: Vertical positions in reading order
+        threshold: Maximum vertical distance from the row's first element
+    
+    Returns:
+        Array of row start indices (always starts with 0 for non-empty input)
+    """
+    return _row_starts(np.ascontiguousarray(ys, dtype=np.float64), float(threshold))